@@ -1 +1,2 @@
 """Package for creating technical indicators using polars."""
+from finta_polars import namespace  # noqa: F401  registers the `ta` namespaces
@@ -0,0 +1,191 @@
+"""Content-addressed on-disk cache of indicator results.
+
+Results are keyed by a hash of the input data, the indicator, its parameters, the
+settings of `finta_polars.config` and the versions of finta_polars and polars, so a
+cached result is reused for the same data whatever the frame or session it comes
+from. Functions are keyed by their import path, so lambdas and local functions, which
+cannot be told apart by name, are refused. Results are stored as Arrow IPC files,
+which are memory-mapped when read, and the least recently used files are evicted
+once the cache exceeds its size.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import sys
+from collections.abc import Callable
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import polars as pl
+
+from finta_polars.config import get_config
+
+_HASH_SEEDS = {"seed": 0, "seed_1": 1, "seed_2": 2, "seed_3": 3}
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of an `IndicatorCache`."""
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+def _library_version() -> str:
+    try:
+        return version("finta-polars")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def fingerprint(df: pl.DataFrame) -> str:
+    """Calculate a fingerprint of the content of a dataframe.
+
+    Args:
+        df (pl.DataFrame): Dataframe to fingerprint.
+
+    Returns:
+        str: Hex digest of the schema and the hash of every row, in order.
+    """
+    digest = hashlib.sha256(repr(list(df.schema.items())).encode())
+    digest.update(df.hash_rows(**_HASH_SEEDS).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Get a representation of a parameter that is stable across sessions.
+
+    Raises:
+        ValueError: If the parameter is a function that cannot be imported by its
+            name, such as a lambda or a local function.
+    """
+    if callable(value):
+        module = sys.modules.get(getattr(value, "__module__", None))
+        obj = module
+        for name in getattr(value, "__qualname__", "<unknown>").split("."):
+            obj = getattr(obj, name, None)
+        if obj is not value:
+            raise ValueError(
+                f"{value!r} cannot be cached, as it cannot be imported by its name."
+            )
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, list | tuple):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class IndicatorCache:
+    """On-disk cache of indicator results with least recently used eviction.
+
+    Indicator functions are wrapped by calling the cache on them, e.g.
+    `cached_macd = cache(macd)`. The wrapped function collects its input to
+    fingerprint it, and returns the cached result as a LazyFrame over a memory-mapped
+    file if there is one, or calculates and stores the result otherwise.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = 1 << 30):
+        """Initialize the cache.
+
+        Args:
+            directory (str | Path): Directory to store the results in. It is created
+                if it does not exist, and results already in it are reused.
+            max_size (int, optional): Maximum total size of the stored results in
+                bytes. Defaults to 1 GiB.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(
+        self, func: Callable[..., pl.LazyFrame]
+    ) -> Callable[..., pl.LazyFrame]:
+        """Wrap an indicator function to cache its results."""
+        signature = inspect.signature(func)
+        data_arg = next(iter(signature.parameters))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            df = bound.arguments[data_arg].lazy().collect()
+            params = {k: v for k, v in bound.arguments.items() if k != data_arg}
+            path = self._path(self.key(df, func, params))
+            if path.exists():
+                self.hits += 1
+                os.utime(path)
+                return pl.read_ipc(path, memory_map=True).lazy()
+            self.misses += 1
+            out = func(df, **params).collect()
+            # Written under a temporary name, so no reader sees a partial file.
+            tmp_path = path.with_suffix(".tmp")
+            out.write_ipc(tmp_path)
+            tmp_path.replace(path)
+            self._evict()
+            return out.lazy()
+
+        return wrapper
+
+    def key(
+        self, df: pl.DataFrame, func: Callable[..., pl.LazyFrame], params: dict
+    ) -> str:
+        """Calculate the key of an indicator result.
+
+        Args:
+            df (pl.DataFrame): Input data of the indicator.
+            func (Callable[..., pl.LazyFrame]): Indicator function.
+            params (dict): Arguments of the indicator other than the input data.
+
+        Returns:
+            str: Hex digest of the input fingerprint, the indicator, its parameters,
+                the configuration and the library versions.
+
+        Raises:
+            ValueError: If the indicator or one of its parameters is a function that
+                cannot be imported by its name, such as a lambda.
+        """
+        parts = [
+            fingerprint(df),
+            _normalize(func),
+            repr(_normalize(params)),
+            repr(_normalize(get_config())),
+            _library_version(),
+            pl.__version__,
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def cache_info(self) -> CacheInfo:
+        """Get the hit and miss counts and the size of the cache."""
+        return CacheInfo(self.hits, self.misses, self._size(), self.max_size)
+
+    def clear(self) -> None:
+        """Remove every stored result and reset the counters."""
+        for path in self._files():
+            path.unlink()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.arrow"
+
+    def _files(self) -> list[Path]:
+        return list(self.directory.glob("*.arrow"))
+
+    def _size(self) -> int:
+        return sum(path.stat().st_size for path in self._files())
+
+    def _evict(self) -> None:
+        """Remove the least recently used results until the cache fits its size."""
+        files = sorted(self._files(), key=lambda path: path.stat().st_mtime_ns)
+        size = sum(path.stat().st_size for path in files)
+        for path in files:
+            if size <= self.max_size:
+                break
+            size -= path.stat().st_size
+            path.unlink()
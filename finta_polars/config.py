@@ -0,0 +1,165 @@
+"""Global configuration of the finta_polars package.
+
+Precision
+---------
+The precision setting controls the dtype indicators are computed and returned in.
+In `"float32"` precision, Float32 price and volume columns are accepted as they are,
+other inputs are cast within the query plan, and every indicator column is Float32.
+
+Kernels are only run in Float32 where it is numerically safe. Measured against
+Float64 on a 1M row geometric random walk:
+
+- Moving medians select an input value, so they only carry the rounding of the input
+  to Float32 (relative error below 1.2e-7).
+- Exponential moving averages are convex combinations of the inputs, so the rounding
+  does not accumulate (relative error below 1e-6).
+- The macd is a difference of exponential moving averages, so its error is bounded
+  relative to the price rather than to the macd itself (below 1e-6 of the price).
+- Moving averages and moving stds use sliding window sums, which accumulate rounding
+  over the whole series. Their sums are therefore kept in Float64 and only the result
+  is rounded to Float32 (relative error below 1.2e-7). In pure Float32 the moving std
+  of prices can be off by more than its own magnitude.
+
+The streaming engine and the append mode always compute in Float64.
+
+Schema coercion
+---------------
+By default, indicators raise a `PolarsSchemaError` for OHLCV columns that are not of
+the expected dtypes. With schema coercion enabled, numeric columns of other dtypes,
+e.g. Int32 prices or UInt32 volume, are cast to the precision's float dtype within
+the same query plan as the indicators instead. Columns that already have an accepted
+dtype are not cast. Frames returned with their OHLCV columns, such as those of the
+`ta` namespace, contain the cast columns.
+
+Categorical identifiers
+-----------------------
+With categorical identifiers enabled, a Utf8 identifier column is cast to
+Categorical once at the start of the query plan, so instruments are partitioned by
+integer codes, and is returned as Categorical. This shrinks the identifier column of
+every output frame to 4 bytes per row. Partitioning itself gains little, as polars
+already hashes the identifier once per query rather than once per indicator. Enable a
+`pl.StringCache` to join or concatenate the outputs of separate queries on the
+identifier.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import polars as pl
+
+PRECISIONS = {"float64": pl.Float64, "float32": pl.Float32}
+
+_config = {
+    "precision": "float64",
+    "schema_coercion": False,
+    "categorical_identifier": False,
+}
+
+
+def get_config() -> dict:
+    """Get a snapshot of the global configuration, e.g. to apply in another process.
+
+    Returns:
+        dict: The precision, schema coercion and categorical identifier settings,
+            keyed by `"precision"`, `"schema_coercion"` and
+            `"categorical_identifier"`.
+    """
+    return dict(_config)
+
+
+def set_precision(precision: str) -> None:
+    """Set the precision indicators are computed and returned in.
+
+    Args:
+        precision (str): Either "float64", the default, or "float32".
+
+    Raises:
+        ValueError: If the precision is not supported.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"Precision must be one of {list(PRECISIONS)}, got {precision!r}."
+        )
+    _config["precision"] = precision
+
+
+def get_precision() -> str:
+    """Get the precision indicators are computed and returned in."""
+    return _config["precision"]
+
+
+@contextmanager
+def use_precision(precision: str) -> Iterator[None]:
+    """Set the precision for the indicators built within a `with` block.
+
+    The precision is applied when an indicator's expressions are built, so a LazyFrame
+    built within the block can be collected after it.
+
+    Args:
+        precision (str): Either "float64" or "float32".
+    """
+    previous = get_precision()
+    set_precision(precision)
+    try:
+        yield
+    finally:
+        set_precision(previous)
+
+
+def set_schema_coercion(enabled: bool) -> None:
+    """Enable or disable casting OHLCV columns of unexpected dtypes.
+
+    Args:
+        enabled (bool): Whether to cast the columns instead of raising an error.
+    """
+    _config["schema_coercion"] = enabled
+
+
+def get_schema_coercion() -> bool:
+    """Get whether OHLCV columns of unexpected dtypes are cast."""
+    return _config["schema_coercion"]
+
+
+@contextmanager
+def use_schema_coercion(enabled: bool = True) -> Iterator[None]:
+    """Enable or disable schema coercion for the indicators built within a block.
+
+    Args:
+        enabled (bool, optional): Whether to cast the columns instead of raising an
+            error. Defaults to True.
+    """
+    previous = get_schema_coercion()
+    set_schema_coercion(enabled)
+    try:
+        yield
+    finally:
+        set_schema_coercion(previous)
+
+
+def set_categorical_identifier(enabled: bool) -> None:
+    """Enable or disable casting Utf8 identifier columns to Categorical.
+
+    Args:
+        enabled (bool): Whether to cast the identifier column to Categorical.
+    """
+    _config["categorical_identifier"] = enabled
+
+
+def get_categorical_identifier() -> bool:
+    """Get whether Utf8 identifier columns are cast to Categorical."""
+    return _config["categorical_identifier"]
+
+
+@contextmanager
+def use_categorical_identifier(enabled: bool = True) -> Iterator[None]:
+    """Enable or disable categorical identifiers for the indicators within a block.
+
+    Args:
+        enabled (bool, optional): Whether to cast the identifier column to
+            Categorical. Defaults to True.
+    """
+    previous = get_categorical_identifier()
+    set_categorical_identifier(enabled)
+    try:
+        yield
+    finally:
+        set_categorical_identifier(previous)
@@ -0,0 +1,392 @@
+"""Expression factories for the indicators.
+
+Every indicator in `finta_polars.indicators` is built on the factories in this
+module. They return plain `pl.Expr` objects, so indicators can be embedded in any
+`select` or `with_columns` and optimized together with the rest of a query.
+
+Factories accept either a column name or an expression. Outputs of a column name are
+aliased to the same names the LazyFrame functions use, e.g. `close_ema_20`. Outputs of
+an expression keep the expression's name with the same suffix appended, which also
+works for expressions selecting several columns such as `pl.col(["open", "close"])`.
+
+Expressions are computed in the precision set in `finta_polars.config` when they are
+built.
+
+Moving averages and stds accept a duration string such as `"30m"` or `"5d"` as period,
+together with a time column, to average over a time window instead of a number of
+rows, which suits irregularly spaced bars. The window of a row is the rows of its
+instrument with a time in `(time - period, time]`.
+"""
+import polars as pl
+
+from finta_polars.config import PRECISIONS, get_precision
+
+
+def _over(expr: pl.Expr, identifier_column: str | None) -> pl.Expr:
+    """Evaluate an expression per instrument if an identifier column is given."""
+    if identifier_column is None:
+        return expr
+    return expr.over(identifier_column)
+
+
+def _finish(
+    expr: pl.Expr,
+    column: str | pl.Expr,
+    suffix: str,
+    identifier_column: str | None,
+) -> pl.Expr:
+    """Partition an indicator expression by instrument and name it."""
+    expr = _over(expr, identifier_column)
+    if isinstance(column, str):
+        return expr.alias(column + suffix)
+    return expr.suffix(suffix)
+
+
+def _to_expr(column: str | pl.Expr, float32_safe: bool = True) -> pl.Expr:
+    """Get the input expression of an indicator in the dtype it is computed in.
+
+    In Float32 precision, kernels that are not numerically safe in Float32 are
+    computed in Float64 and their output is cast with `_to_output`.
+    """
+    expr = pl.col(column) if isinstance(column, str) else column
+    if get_precision() == "float64":
+        return expr
+    return expr.cast(pl.Float32 if float32_safe else pl.Float64)
+
+
+def _rolling_kwargs(period: int | str, time_column: str | None) -> dict:
+    """Get the keyword arguments of a rolling function for a period.
+
+    Duration periods are windows over the time column, closed on the right so the
+    window of a row ends with the row itself.
+    """
+    if not isinstance(period, str):
+        return {"window_size": period}
+    if time_column is None:
+        raise ValueError(
+            f"A time column is required for the duration period {period!r}."
+        )
+    return {"window_size": period, "by": time_column, "closed": "right"}
+
+
+def _to_output(expr: pl.Expr) -> pl.Expr:
+    """Cast the output of an indicator to the configured precision."""
+    if get_precision() == "float64":
+        return expr
+    return expr.cast(PRECISIONS[get_precision()])
+
+
+def sma_expr(
+    column: str | pl.Expr,
+    period: int | str = 20,
+    identifier_column: str | None = None,
+    time_column: str | None = None,
+) -> pl.Expr:
+    """Create a simple moving average expression.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the moving average of.
+        period (int | str, optional): Period to use for the moving average, either a
+            number of rows or a duration such as `"30m"`. Defaults to 20.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
+
+    Returns:
+        pl.Expr: Expression named with the `_sma_{period}` suffix.
+
+    Raises:
+        ValueError: If the period is a duration and no time column is given.
+    """
+    kwargs = _rolling_kwargs(period, time_column)
+    expr = _to_output(_to_expr(column, float32_safe=False).rolling_mean(**kwargs))
+    return _finish(expr, column, f"_sma_{period}", identifier_column)
+
+
+def smm_expr(
+    column: str | pl.Expr,
+    period: int = 20,
+    identifier_column: str | None = None,
+) -> pl.Expr:
+    """Create a simple moving median expression.
+
+    Polars cannot express a moving median over a duration, so duration periods are
+    only supported by `finta_polars.indicators.simple_moving_median`, which computes
+    them with `groupby_rolling`.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the moving median of.
+        period (int, optional): Period to use for the moving median.
+            Defaults to 20.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        pl.Expr: Expression named with the `_smm_{period}` suffix.
+
+    Raises:
+        ValueError: If the period is a duration.
+    """
+    if isinstance(period, str):
+        raise ValueError(
+            f"Duration period {period!r} is not supported by smm_expr, "
+            "use simple_moving_median instead."
+        )
+    expr = _to_expr(column).rolling_median(period)
+    return _finish(expr, column, f"_smm_{period}", identifier_column)
+
+
+def msd_expr(
+    column: str | pl.Expr,
+    period: int | str = 20,
+    identifier_column: str | None = None,
+    time_column: str | None = None,
+) -> pl.Expr:
+    """Create a moving std expression.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the moving std of.
+        period (int | str, optional): Period to use for the moving std, either a
+            number of rows or a duration such as `"30m"`. Defaults to 20.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
+
+    Returns:
+        pl.Expr: Expression named with the `_msd_{period}` suffix.
+
+    Raises:
+        ValueError: If the period is a duration and no time column is given.
+    """
+    kwargs = _rolling_kwargs(period, time_column)
+    expr = _to_output(_to_expr(column, float32_safe=False).rolling_std(**kwargs))
+    return _finish(expr, column, f"_msd_{period}", identifier_column)
+
+
+def ema_expr(
+    column: str | pl.Expr,
+    period: int = 20,
+    identifier_column: str | None = None,
+) -> pl.Expr:
+    """Create an exponential moving average expression.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the exponential
+            moving average of.
+        period (int, optional): Period to use for the exponential moving average.
+            Defaults to 20.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        pl.Expr: Expression named with the `_ema_{period}` suffix.
+    """
+    expr = _to_expr(column).ewm_mean(span=period)
+    return _finish(expr, column, f"_ema_{period}", identifier_column)
+
+
+def rsi_expr(
+    column: str | pl.Expr,
+    period: int = 14,
+    identifier_column: str | None = None,
+    adjust: bool = True,
+) -> pl.Expr:
+    """Create a relative strength index expression.
+
+    Gains and losses are smoothed with Wilder's moving average, an `ewm_mean` with
+    `alpha = 1 / period`. The differences, the smoothing of gains and losses and
+    their ratio are evaluated in the same window pass.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the relative
+            strength index of.
+        period (int, optional): Period to use for the relative strength index.
+            Defaults to 14.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        adjust (bool, optional): Whether to use the adjusted weights of `ewm_mean`,
+            as finta does. Defaults to True. Wilder's original recursion is
+            `adjust=False`.
+
+    Returns:
+        pl.Expr: Expression named with the `_rsi_{period}` suffix.
+    """
+    delta = _to_expr(column).diff()
+    gain = delta.clip_min(0).ewm_mean(alpha=1 / period, adjust=adjust)
+    loss = (-delta).clip_min(0).ewm_mean(alpha=1 / period, adjust=adjust)
+    expr = _to_output(100 - 100 / (1 + gain / loss))
+    return _finish(expr, column, f"_rsi_{period}", identifier_column)
+
+
+def macd_exprs(
+    column: str | pl.Expr,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+    identifier_column: str | None = None,
+) -> list[pl.Expr]:
+    """Create the moving average convergence divergence and signal line expressions.
+
+    The signal line is expressed on top of the macd expression itself, so both are
+    evaluated in the same window pass.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the macd of.
+        fast_period (int, optional): Period to use for the fast moving average.
+            Defaults to 12.
+        slow_period (int, optional): Period to use for the slow moving average.
+            Defaults to 26.
+        signal_period (int, optional): Period to use for the signal line.
+            Defaults to 9.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        list[pl.Expr]: The macd expression, named with the
+            `_macd_{fast_period}_{slow_period}` suffix, and its signal line, named
+            with an additional `_signal` suffix.
+    """
+    expr = _to_expr(column)
+    macd = expr.ewm_mean(span=slow_period) - expr.ewm_mean(span=fast_period)
+    signal = macd.ewm_mean(span=signal_period)
+    suffix = f"_macd_{fast_period}_{slow_period}"
+    return [
+        _finish(macd, column, suffix, identifier_column),
+        _finish(signal, column, suffix + "_signal", identifier_column),
+    ]
+
+
+def _bbands_deviation(
+    mean: pl.Expr, mean_of_squares: pl.Expr, period: int, std: float
+) -> pl.Expr:
+    """Get the distance of the outer bollinger bands to the moving mean.
+
+    The sample variance is derived from the moving mean and the moving mean of
+    squares. Rounding can make it slightly negative over flat windows, so it is
+    clipped at 0.
+    """
+    scale = std**2 * period / (period - 1) if period > 1 else float("nan")
+    return ((mean_of_squares - mean * mean).clip_min(0) * scale).sqrt()
+
+
+def bbands_exprs(
+    column: str | pl.Expr,
+    period: int = 20,
+    std: float = 2.0,
+    identifier_column: str | None = None,
+) -> list[pl.Expr]:
+    """Create the bollinger bands expressions.
+
+    The middle band and the moving std are both derived from the moving mean of the
+    column and the moving mean of its square, instead of a separate moving std.
+
+    Args:
+        column (str | pl.Expr): Column or expression to calculate the bollinger
+            bands of.
+        period (int, optional): Period to use for the bollinger bands.
+            Defaults to 20.
+        std (float, optional): Standard deviation to use for the bollinger bands.
+            Defaults to 2.0.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        list[pl.Expr]: The upper, middle and lower bands, named with the
+            `_bbands_{period}_upper`, `_bbands_{period}_middle` and
+            `_bbands_{period}_lower` suffixes.
+    """
+    expr = _to_expr(column, float32_safe=False)
+    mean = _over(expr.rolling_mean(period), identifier_column)
+    mean_of_squares = _over((expr * expr).rolling_mean(period), identifier_column)
+    deviation = _bbands_deviation(mean, mean_of_squares, period, std)
+    bands = {"upper": mean + deviation, "middle": mean, "lower": mean - deviation}
+    return [
+        _finish(_to_output(band), column, f"_bbands_{period}_{name}", None)
+        for name, band in bands.items()
+    ]
+
+
+def vwap_expr(
+    period: int | str | None = None,
+    identifier_column: str | None = None,
+    session: str | pl.Expr | None = None,
+    time_column: str | None = None,
+    price: str | pl.Expr | None = None,
+) -> pl.Expr:
+    """Create a volume weighted average price expression.
+
+    The price of a row is its typical price, unless a price is given. Without a
+    period, the vwap is the ratio of the cumulative sums of price times volume and of
+    volume, restarted at every session if a session is given. With a period, it is
+    the ratio of the rolling sums instead.
+
+    Args:
+        period (int | str, optional): Period of a rolling vwap, either a number of
+            rows or a duration such as `"30m"`. Defaults to None. If None, the vwap
+            is cumulative.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        session (str | pl.Expr, optional): Column or expression of the session of
+            each row, e.g. `pl.col("time").dt.date()`. The cumulative vwap is
+            partitioned by instrument and session. Defaults to None.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
+        price (str | pl.Expr, optional): Column or expression of the price of each
+            row. Defaults to None. If None, the typical price is used.
+
+    Returns:
+        pl.Expr: Expression named `vwap`, or `vwap_{period}` for a rolling vwap.
+
+    Raises:
+        ValueError: If both a period and a session are given, or if the period is a
+            duration and no time column is given.
+    """
+    if price is None:
+        price = (
+            _to_expr("high", float32_safe=False)
+            + _to_expr("low", float32_safe=False)
+            + _to_expr("close", float32_safe=False)
+        ) / 3
+    else:
+        price = _to_expr(price, float32_safe=False)
+    volume = _to_expr("volume", float32_safe=False)
+    price_volume = price * volume
+    if period is None:
+        expr = price_volume.cumsum() / volume.cumsum()
+        name = "vwap"
+    elif session is not None:
+        raise ValueError("Session resets only apply to the cumulative vwap.")
+    else:
+        kwargs = _rolling_kwargs(period, time_column)
+        expr = price_volume.rolling_sum(**kwargs) / volume.rolling_sum(**kwargs)
+        name = f"vwap_{period}"
+    expr = _to_output(expr)
+    if session is not None:
+        partition = [] if identifier_column is None else [pl.col(identifier_column)]
+        partition.append(pl.col(session) if isinstance(session, str) else session)
+        return expr.over(partition).alias(name)
+    return _over(expr, identifier_column).alias(name)
+
+
+def typical_price_expr() -> pl.Expr:
+    """Create a typical price expression.
+
+    Returns:
+        pl.Expr: Arithmetic mean of high low and close, named `typical_price`.
+    """
+    return ((_to_expr("high") + _to_expr("low") + _to_expr("close")) / 3).alias(
+        "typical_price"
+    )
@@ -0,0 +1,350 @@
+"""Incremental computation of indicators over appended rows.
+
+Instead of recomputing indicators over the whole history whenever new rows are
+appended, the functions in this module carry a compact state per instrument and
+only compute the new rows:
+
+- Rolling indicators recompute the new rows together with the last `period - 1`
+  rows of the history.
+- `ewm_mean` based indicators (exponential moving average and macd) continue the
+  recursion of polars' `ewm_mean` from the carried value and weight, so they are
+  identical to a full recompute.
+
+Moving medians are identical to a full recompute as well. Moving averages and stds
+match a full recompute up to the rounding polars' sliding window sums accumulate
+over the history, which is on the order of 1e-12 relative to the values.
+
+The state and the appended rows are always computed in Float64, and the identifier
+column is returned with the dtype it was given in.
+"""
+import numpy as np
+import polars as pl
+
+from finta_polars.config import use_categorical_identifier, use_precision
+from finta_polars.indicators import (
+    OHLC_COLUMNS,
+    IndicatorSpec,
+    _build_indicator_exprs,
+    _expand_indicator_specs,
+    _exponential_moving_average_exprs,
+    _get_ohlcv_columns,
+    _macd_exprs,
+    _resolve_indicator_spec,
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+from finta_polars.streaming import _bind_params, _EMAState, _output_name
+
+_IDENTIFIER = "__identifier"
+_IS_NEW = "__is_new"
+
+
+def _split_indicators(
+    indicators: list[IndicatorSpec],
+) -> tuple[list[IndicatorSpec], list[tuple]]:
+    """Split indicator specs into rolling specs and `ewm_mean` based specs."""
+    rolling, ewm = [], []
+    for spec in _expand_indicator_specs(indicators):
+        builder, include_volume, params = _resolve_indicator_spec(spec)
+        func = spec[0] if isinstance(spec, tuple) else spec
+        if func in (exponential_moving_average, macd):
+            ewm.append((func, builder, include_volume, _bind_params(builder, params)))
+        elif func in (simple_moving_average, simple_moving_median, moving_std):
+            rolling.append(spec)
+        else:
+            raise ValueError(f"{func.__name__} cannot be computed incrementally.")
+    return rolling, ewm
+
+
+def _lookback(indicators: list[IndicatorSpec]) -> int:
+    """Get the number of history rows rolling indicators need to continue."""
+    lookback = 0
+    for spec in indicators:
+        builder, _, params = _resolve_indicator_spec(spec)
+        period = _bind_params(builder, params)["period"]
+        if not isinstance(period, int):
+            raise ValueError(f"Period {period!r} cannot be computed incrementally.")
+        lookback = max(lookback, period - 1)
+    return lookback
+
+
+def _ewm_keys(ewm: list[tuple], columns: list[str]) -> dict[str, tuple]:
+    """Get the `ewm_mean` states the indicators need.
+
+    Returns:
+        dict[str, tuple]: Maps the name of each state to its span, and either the
+            column it is calculated on or the macd it is the signal line of.
+    """
+    keys = {}
+    for func, builder, include_volume, params in ewm:
+        for c in [c for c in columns if include_volume or c in OHLC_COLUMNS]:
+            if func is exponential_moving_average:
+                keys[f"{c}_{params['period']}"] = (params["period"], c, None)
+            else:
+                keys[f"{c}_{params['fast_period']}"] = (params["fast_period"], c, None)
+                keys[f"{c}_{params['slow_period']}"] = (params["slow_period"], c, None)
+                signal = _output_name(builder, c, params, 1)
+                keys[signal] = (params["signal_period"], c, params)
+    return keys
+
+
+def _with_identifier(
+    ohlc_df: pl.DataFrame, identifier_column: str | None
+) -> tuple[pl.DataFrame, str]:
+    """Add a constant identifier column when the dataframe has a single instrument."""
+    if identifier_column is None:
+        return ohlc_df.with_columns(pl.lit(0).alias(_IDENTIFIER)), _IDENTIFIER
+    return ohlc_df, identifier_column
+
+
+@use_precision("float64")
+@use_categorical_identifier(False)
+def indicator_state(
+    ohlc_df: pl.DataFrame | pl.LazyFrame,
+    indicators: list[IndicatorSpec],
+    identifier_column: str | None = None,
+    columns: list[str] | None = None,
+) -> pl.DataFrame:
+    """Calculates the state needed to append rows to a history of indicators.
+
+    This runs over the whole history once. Afterwards `append_indicators` keeps the
+    state up to date, so it can be stored next to the indicator output.
+
+    Args:
+        ohlc_df (pl.DataFrame | pl.LazyFrame): History of OHLC data.
+            Volume can optionally be included.
+        indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+            accepted by `compute_indicators`.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+
+    Returns:
+        pl.DataFrame: One row per instrument holding the tail of its history and the
+            value and weight of every `ewm_mean` the indicators depend on.
+    """
+    ohlc_df = ohlc_df.lazy()
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    rolling, ewm = _split_indicators(indicators)
+    lookback = _lookback(rolling)
+    ohlc_df, identifier = _with_identifier(ohlc_df, identifier_column)
+
+    aggs = [pl.col(columns).tail(lookback)]
+    keys = _ewm_keys(ewm, columns)
+    for name, (span, c, macd_params) in keys.items():
+        if macd_params is None:
+            (expr,) = _exponential_moving_average_exprs([c], span)
+            count = pl.col(c).drop_nulls().count()
+        else:
+            macd_expr, expr = _macd_exprs([c], **macd_params)
+            count = macd_expr.drop_nulls().count()
+        aggs.append(expr.last().alias(f"__ewm_{name}"))
+        aggs.append(count.alias(f"__count_{name}"))
+    state = ohlc_df.groupby(identifier, maintain_order=True).agg(aggs).collect()
+
+    for name, (span, _, _) in keys.items():
+        ewm_state = _EMAState(span, len(state))
+        ewm_state.seed(
+            np.arange(len(state)),
+            state[f"__ewm_{name}"].fill_null(np.nan).to_numpy(),
+            state[f"__count_{name}"].to_numpy().astype(np.int64),
+        )
+        state = state.drop(f"__count_{name}").with_columns(
+            pl.Series(f"__weight_{name}", ewm_state.weight)
+        )
+    return state
+
+
+@use_precision("float64")
+@use_categorical_identifier(False)
+def append_indicators(
+    state: pl.DataFrame,
+    new_df: pl.DataFrame | pl.LazyFrame,
+    indicators: list[IndicatorSpec],
+    identifier_column: str | None = None,
+    columns: list[str] | None = None,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Calculates indicators for rows appended to a history.
+
+    The output is the same as calling `compute_indicators` on the history with the
+    new rows appended and keeping the new rows.
+
+    Args:
+        state (pl.DataFrame): State of the history, as returned by `indicator_state`
+            or a previous call of this function.
+        new_df (pl.DataFrame | pl.LazyFrame): New rows of OHLC data, with the same
+            columns as the history. Rows of each instrument must be sorted in time.
+        indicators (list[IndicatorSpec]): Indicators to calculate. These must be the
+            same as the ones the state was calculated for.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+
+    Returns:
+        tuple[pl.DataFrame, pl.DataFrame]: The indicators for the new rows, and the
+            updated state to use for the next append.
+    """
+    new_df = new_df.lazy().collect()
+    columns = _get_ohlcv_columns(new_df.lazy(), columns)
+    rolling, ewm = _split_indicators(indicators)
+    lookback = _lookback(rolling)
+    new_df, identifier = _with_identifier(new_df, identifier_column)
+    history = (
+        state.select(identifier, *columns)
+        .filter(pl.col(columns[0]).arr.lengths() > 0)
+        .explode(columns)
+    )
+
+    out = compute_indicators(
+        pl.concat(
+            [
+                history.with_columns(pl.lit(False).alias(_IS_NEW)),
+                new_df.with_columns(pl.lit(True).alias(_IS_NEW)),
+            ],
+            how="diagonal",
+        ),
+        rolling,
+        identifier_column=identifier,
+        columns=columns,
+    )
+    out = out.filter(pl.col(_IS_NEW)).drop(_IS_NEW).collect()
+    if identifier_column is None:
+        out = out.drop(_IDENTIFIER)
+
+    ewm_columns, new_state = _append_ewm(state, new_df, ewm, columns, identifier)
+    out = out.with_columns(ewm_columns)
+    out = out.select(
+        *[c for c in new_df.columns if c not in columns and c != _IDENTIFIER],
+        *[
+            expr.meta.output_name()
+            for expr in _build_indicator_exprs(columns, indicators)
+        ],
+    )
+
+    tails = (
+        pl.concat([history, new_df.select(identifier, *columns)])
+        .groupby(identifier, maintain_order=True)
+        .agg(pl.col(columns).tail(lookback))
+    )
+    new_state = tails.join(new_state, on=identifier, how="left")
+    return out, new_state
+
+
+def _append_ewm(
+    state: pl.DataFrame,
+    new_df: pl.DataFrame,
+    ewm: list[tuple],
+    columns: list[str],
+    identifier: str,
+) -> tuple[list[pl.Series], pl.DataFrame]:
+    """Continue every `ewm_mean` state over the new rows."""
+    slots = dict(zip(state[identifier].to_list(), range(len(state))))
+    identifiers = new_df[identifier].unique(maintain_order=True).to_list()
+    for i in identifiers:
+        if i not in slots:
+            slots[i] = len(slots)
+    row_slots = np.fromiter(
+        (slots[i] for i in new_df[identifier].to_list()),
+        dtype=np.int64,
+        count=len(new_df),
+    )
+    rounds = new_df.select(pl.col(identifier).cumcount().over(identifier))
+    rounds = rounds.to_series().to_numpy().astype(np.int64)
+
+    keys = _ewm_keys(ewm, columns)
+    ewm_outputs = _ewm_outputs(ewm, columns)
+    ewm_states = {}
+    for name, (span, _, _) in keys.items():
+        ewm_state = _EMAState(span, len(slots))
+        ewm_state.value[: len(state)] = (
+            state[f"__ewm_{name}"].fill_null(np.nan).to_numpy()
+        )
+        ewm_state.weight[: len(state)] = state[f"__weight_{name}"].to_numpy()
+        ewm_states[name] = ewm_state
+
+    values = {
+        c: new_df[c].cast(pl.Float64).fill_null(np.nan).to_numpy() for c in columns
+    }
+    outputs = {}
+    for step in range(int(rounds.max(initial=-1)) + 1):
+        rows = np.flatnonzero(rounds == step)
+        for name, out in _update_ewm(
+            ewm_states, keys, ewm_outputs, row_slots[rows], rows, values
+        ).items():
+            outputs.setdefault(name, np.full(len(new_df), np.nan))[rows] = out
+
+    new_state = pl.DataFrame(
+        [pl.Series(identifier, list(slots), dtype=new_df[identifier].dtype)]
+    )
+    for name, ewm_state in ewm_states.items():
+        new_state = new_state.with_columns(
+            pl.Series(f"__ewm_{name}", ewm_state.value, nan_to_null=True),
+            pl.Series(f"__weight_{name}", ewm_state.weight),
+        )
+    output_columns = [
+        pl.Series(name, out, dtype=pl.Float64, nan_to_null=True)
+        for name, out in outputs.items()
+    ]
+    return output_columns, new_state
+
+
+def _ewm_outputs(ewm: list[tuple], columns: list[str]) -> list[tuple]:
+    """List the output columns of `ewm_mean` based indicators.
+
+    Returns:
+        list[tuple]: For each exponential moving average its name and state, and
+            for each macd its name, its signal line name and the states of its slow
+            and fast moving averages.
+    """
+    outputs = []
+    for func, builder, include_volume, params in ewm:
+        for c in [c for c in columns if include_volume or c in OHLC_COLUMNS]:
+            if func is exponential_moving_average:
+                name = _output_name(builder, c, params)
+                outputs.append((name, f"{c}_{params['period']}"))
+            else:
+                outputs.append(
+                    (
+                        _output_name(builder, c, params, 0),
+                        _output_name(builder, c, params, 1),
+                        f"{c}_{params['slow_period']}",
+                        f"{c}_{params['fast_period']}",
+                    )
+                )
+    return outputs
+
+
+def _update_ewm(
+    ewm_states: dict[str, _EMAState],
+    keys: dict[str, tuple],
+    ewm_outputs: list[tuple],
+    slots: np.ndarray,
+    rows: np.ndarray,
+    values: dict[str, np.ndarray],
+) -> dict[str, np.ndarray]:
+    """Advance `ewm_mean` states whose instruments each receive exactly one row."""
+    averages = {
+        name: ewm_states[name].update(slots, values[c][rows])
+        for name, (_, c, macd_params) in keys.items()
+        if macd_params is None
+    }
+    outputs = {}
+    for output in ewm_outputs:
+        if len(output) == 2:
+            name, state = output
+            outputs[name] = averages[state]
+        else:
+            name, signal, slow, fast = output
+            outputs[name] = averages[slow] - averages[fast]
+            outputs[signal] = ewm_states[signal].update(slots, outputs[name])
+    return outputs
@@ -3,14 +3,44 @@
 This module contains all the functions used to calculate the
 various technical indicators supported.
 """
-from typing import Callable
+import functools
+from typing import Callable, NamedTuple
 
 import polars as pl
 
-from finta_polars.schemas import validate_indicator_schema
+from finta_polars.config import (
+    get_categorical_identifier,
+    get_precision,
+    get_schema_coercion,
+    use_categorical_identifier,
+    use_precision,
+    use_schema_coercion,
+)
+from finta_polars.expressions import (
+    _bbands_deviation,
+    _to_expr,
+    _to_output,
+    ema_expr,
+    macd_exprs,
+    msd_expr,
+    rsi_expr,
+    sma_expr,
+    smm_expr,
+    typical_price_expr,
+    vwap_expr,
+)
+from finta_polars.schemas import (
+    get_schema,
+    indicator_schema_casts,
+    validate_indicator_schema,
+)
 
 OHLC_COLUMNS = ["open", "high", "low", "close"]
 OHLCV_COLUMNS = [*OHLC_COLUMNS, "volume"]
+VWAP_COLUMNS = ["high", "low", "close", "volume"]
+OUTPUT_MODES = ["full", "lean", "append"]
+ROW_KEY = "row_nr"
+_WINDOW_ROW = "__window_row_nr"
 
 
 def make_lazy(func):
@@ -20,6 +50,7 @@ def make_lazy(func):
     This assumes the DataFrame is always the first argument of a function.
     """
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         if len(args) > 0:
             if isinstance(args[0], pl.DataFrame):
@@ -37,58 +68,347 @@ def make_lazy(func):
     return wrapper
 
 
-def _get_ohlcv_columns(ohlc_df: pl.LazyFrame) -> list[str]:
+def _get_ohlcv_columns(
+    ohlc_df: pl.LazyFrame, columns: list[str] | None = None
+) -> list[str]:
     """Get the OHLCV columns from a dataframe.
 
     Args:
         ohlc_df (pl.DataFrame): Dataframe containing the OHLCV data.
+        columns (list[str], optional): Columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
 
     Returns:
         list[str]: List of OHLCV columns.
     """
-    if "volume" in ohlc_df.columns:
+    validate = (
+        indicator_schema_casts if get_schema_coercion() else validate_indicator_schema
+    )
+    if columns is not None:
+        validate(ohlc_df, columns=columns)
+        return list(columns)
+    if "volume" in get_schema(ohlc_df):
         columns = OHLCV_COLUMNS
-        validate_indicator_schema(ohlc_df, include_volume=True)
+        validate(ohlc_df, include_volume=True)
     else:
         columns = OHLC_COLUMNS
-        validate_indicator_schema(ohlc_df, include_volume=False)
+        validate(ohlc_df, include_volume=False)
     return columns
 
 
+def _coerce_ohlcv_columns(
+    ohlc_df: pl.LazyFrame, ohlcv_columns: list[str]
+) -> pl.LazyFrame:
+    """Cast the OHLCV columns of a dataframe if schema coercion is enabled."""
+    if not get_schema_coercion():
+        return ohlc_df
+    casts = indicator_schema_casts(ohlc_df, columns=ohlcv_columns)
+    return ohlc_df.with_columns(casts) if casts else ohlc_df
+
+
 def _add_identifier_over_to_expr(
     expr: pl.Expr | list[pl.Expr],
     identifier_column: str | None,
+    sorted_by_identifier: bool = False,
 ) -> list[pl.Expr]:
-    """Add an identifier column to an expression."""
+    """Add an identifier column to an expression.
+
+    If the dataframe is contiguous by identifier, the identifier is flagged as sorted
+    within the window, so the windows are found as slices of consecutive rows instead
+    of by hashing the identifier, and their results are not scattered back. The
+    flag only applies to the window, so the identifier column is returned as it was.
+    """
     if not isinstance(expr, list):
         expr = [expr]
     if identifier_column is not None:
-        expr = [e.over(identifier_column) for e in expr]
+        partition = pl.col(identifier_column)
+        if sorted_by_identifier:
+            partition = partition.set_sorted()
+        expr = [e.over(partition) for e in expr]
     return expr
 
 
+def _encode_identifier(
+    ohlc_df: pl.LazyFrame, identifier_column: str | None
+) -> pl.LazyFrame:
+    """Cast a Utf8 identifier column to Categorical if enabled in the config."""
+    if (
+        identifier_column is None
+        or not get_categorical_identifier()
+        or get_schema(ohlc_df).get(identifier_column) != pl.Utf8
+    ):
+        return ohlc_df
+    return ohlc_df.with_columns(pl.col(identifier_column).cast(pl.Categorical))
+
+
 def _apply_expr(
     ohlcv_df: pl.LazyFrame,
     ohlcv_columns: list[str],
     expr: pl.Expr | list[pl.Expr],
-    identifier_column,
-    suffix: str,
+    identifier_column: str | None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
+    computed_columns: list[str] | None = None,
 ) -> pl.LazyFrame:
-    """Apply an expression to a dataframe."""
-    expr = _add_identifier_over_to_expr(expr, identifier_column)
-    expr = [e.suffix(suffix) for e in expr]
+    """Apply an expression to a dataframe, selecting the columns of an output mode.
 
+    `computed_columns` are indicator columns already added to the dataframe, which are
+    selected as indicator columns after the expression.
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"output must be one of {OUTPUT_MODES}, got {output!r}.")
+    expr = _add_identifier_over_to_expr(expr, identifier_column, sorted_by_identifier)
+
+    ohlcv_df = _encode_identifier(ohlcv_df, identifier_column)
+    ohlcv_df = _coerce_ohlcv_columns(ohlcv_df, ohlcv_columns)
+    computed_columns = computed_columns or []
+    if output == "append":
+        return ohlcv_df.with_columns(expr)
+    if output == "lean":
+        if ROW_KEY not in get_schema(ohlcv_df):
+            ohlcv_df = ohlcv_df.with_row_count(ROW_KEY)
+        keys = [ROW_KEY] if identifier_column is None else [identifier_column, ROW_KEY]
+        return ohlcv_df.select(*keys, *expr, *computed_columns)
     return ohlcv_df.select(
-        pl.all().exclude(ohlcv_columns),
+        pl.all().exclude([*ohlcv_columns, *computed_columns]),
         *expr,
+        *computed_columns,
+    )
+
+
+class _DerivedOutputs(NamedTuple):
+    """Expressions deriving indicator columns from the struct columns of a window.
+
+    Indicators whose outputs share intermediate results, such as the rolling sums of
+    the bollinger bands, evaluate only those in the window, as the fields of struct
+    columns, and derive their outputs from them row by row.
+    """
+
+    structs: list[str]
+    intermediates: list[pl.Expr]
+    outputs: list[pl.Expr]
+    fields: list[str]
+
+
+def _derive_outputs(
+    ohlc_df: pl.LazyFrame | pl.DataFrame, derived: _DerivedOutputs
+) -> pl.LazyFrame | pl.DataFrame:
+    """Replace the struct columns of a window by the outputs derived from them.
+
+    The outputs are added after the other columns of the dataframe.
+    """
+    if not derived.structs:
+        return ohlc_df
+    return (
+        ohlc_df.unnest(derived.structs)
+        .with_columns(derived.intermediates)
+        .select(pl.all().exclude(derived.fields), *derived.outputs)
     )
 
 
+def _periods(period: int | str | list[int | str]) -> list[int | str]:
+    """Get the list of periods from a period argument."""
+    return list(period) if isinstance(period, list | tuple) else [period]
+
+
+def _simple_moving_average_exprs(
+    columns: list[str],
+    period: int | str | list[int | str] = 20,
+    time_column: str | None = None,
+) -> list[pl.Expr]:
+    """Build the simple moving average expressions for the given columns."""
+    return [
+        sma_expr(c, p, time_column=time_column)
+        for p in _periods(period)
+        for c in columns
+    ]
+
+
+def _simple_moving_median_exprs(
+    columns: list[str],
+    period: int | list[int] = 20,
+    time_column: str | None = None,
+) -> list[pl.Expr]:
+    """Build the simple moving median expressions for the given columns.
+
+    Only periods in rows can be built as expressions, see `smm_expr`.
+    """
+    return [smm_expr(c, p) for p in _periods(period) for c in columns]
+
+
+def _moving_std_exprs(
+    columns: list[str],
+    period: int | str | list[int | str] = 20,
+    time_column: str | None = None,
+) -> list[pl.Expr]:
+    """Build the moving std expressions for the given columns."""
+    return [
+        msd_expr(c, p, time_column=time_column)
+        for p in _periods(period)
+        for c in columns
+    ]
+
+
+def _add_time_window_medians(
+    ohlc_df: pl.LazyFrame,
+    columns: list[str],
+    periods: list[str],
+    identifier_column: str | None,
+    time_column: str | None,
+) -> tuple[pl.LazyFrame, list[str]]:
+    """Add moving medians over duration periods to a dataframe.
+
+    Each period is a `groupby_rolling` over the time column, whose windows end with
+    the row they belong to, so the last row number of a window identifies its row.
+    The medians are joined back on it, keeping the rows in order.
+
+    Returns:
+        tuple[pl.LazyFrame, list[str]]: The dataframe with the medians added, and
+            the names of the median columns.
+    """
+    if time_column is None:
+        raise ValueError(
+            f"A time column is required for the duration periods {periods}."
+        )
+    ohlc_df = ohlc_df.with_row_count(_WINDOW_ROW)
+    names = []
+    for period in periods:
+        aliases = [f"{c}_smm_{period}" for c in columns]
+        medians = ohlc_df.groupby_rolling(
+            time_column, period=period, closed="right", by=identifier_column
+        ).agg(
+            pl.col(_WINDOW_ROW).last(),
+            *[_to_expr(c).median().alias(a) for c, a in zip(columns, aliases)],
+        )
+        ohlc_df = ohlc_df.join(
+            medians.select(_WINDOW_ROW, *aliases), on=_WINDOW_ROW, how="left"
+        )
+        names.extend(aliases)
+    return ohlc_df.drop(_WINDOW_ROW), names
+
+
+def _exponential_moving_average_exprs(
+    columns: list[str], period: int | list[int] = 20
+) -> list[pl.Expr]:
+    """Build the exponential moving average expressions for the given columns."""
+    return [ema_expr(c, p) for p in _periods(period) for c in columns]
+
+
+def _rsi_exprs(
+    columns: list[str], period: int | list[int] = 14, adjust: bool = True
+) -> list[pl.Expr]:
+    """Build the relative strength index expressions for the given columns."""
+    return [rsi_expr(c, p, adjust=adjust) for p in _periods(period) for c in columns]
+
+
+def _vwap_exprs(
+    columns: list[str],
+    period: int | str | list[int | str] | None = None,
+    session: str | pl.Expr | None = None,
+    time_column: str | None = None,
+) -> list[pl.Expr]:
+    """Build the vwap expressions, which require the columns of `VWAP_COLUMNS`.
+
+    Session resets partition the window by session as well as by instrument, so they
+    are only supported by `vwap`, which adds the partitioned expression itself.
+    """
+    missing = [c for c in VWAP_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"vwap requires the columns {missing}.")
+    if session is not None:
+        raise ValueError(
+            "Session resets are not supported by compute_indicators, use vwap instead."
+        )
+    return [
+        vwap_expr(p, session=session, time_column=time_column) for p in _periods(period)
+    ]
+
+
+def _macd_exprs(
+    columns: list[str],
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+) -> list[pl.Expr]:
+    """Build the macd and signal line expressions for the given columns."""
+    return [
+        e
+        for c in columns
+        for e in macd_exprs(c, fast_period, slow_period, signal_period)
+    ]
+
+
+def _bbands_exprs(
+    columns: list[str],
+    period: int | list[int] = 20,
+    std: float = 2.0,
+    ma_func: Callable[[str, int], pl.Expr] | None = None,
+) -> list[pl.Expr]:
+    """Build the window expressions of the bollinger bands for the given columns.
+
+    Each period is one struct of the moving mean of every column and of its square,
+    and of the `ma_func` middle band if one is given. The bands are derived from its
+    fields by the expressions of `_bbands_outputs`.
+    """
+    exprs = []
+    for p in _periods(period):
+        fields = []
+        for c in columns:
+            expr = _to_expr(c, float32_safe=False)
+            fields += [
+                expr.rolling_mean(p).alias(f"__{c}_bbands_{p}_mean"),
+                (expr * expr).rolling_mean(p).alias(f"__{c}_bbands_{p}_deviation"),
+            ]
+            if ma_func is not None:
+                fields.append(ma_func(c, p).alias(f"__{c}_bbands_{p}_ma"))
+        exprs.append(pl.struct(fields).alias(f"__bbands_{p}"))
+    return exprs
+
+
+def _bbands_outputs(
+    columns: list[str],
+    period: int | list[int] = 20,
+    std: float = 2.0,
+    ma_func: Callable[[str, int], pl.Expr] | None = None,
+) -> _DerivedOutputs:
+    """Build the expressions deriving the bollinger bands from `_bbands_exprs`.
+
+    The moving mean of squares is replaced by the distance of the outer bands to the
+    middle band, which the upper and lower bands are then offset by.
+    """
+    structs, deviations, bands, fields = [], [], [], []
+    for p in _periods(period):
+        structs.append(f"__bbands_{p}")
+        for c in columns:
+            prefix = f"{c}_bbands_{p}"
+            mean, deviation = f"__{prefix}_mean", f"__{prefix}_deviation"
+            middle = mean if ma_func is None else f"__{prefix}_ma"
+            deviations.append(
+                _bbands_deviation(pl.col(mean), pl.col(deviation), p, std).alias(
+                    deviation
+                )
+            )
+            bands += [
+                _to_output(pl.col(middle) + pl.col(deviation)).alias(f"{prefix}_upper"),
+                _to_output(pl.col(middle)).alias(f"{prefix}_middle"),
+                _to_output(pl.col(middle) - pl.col(deviation)).alias(f"{prefix}_lower"),
+            ]
+            fields += [mean, deviation]
+            if ma_func is not None:
+                fields.append(middle)
+    return _DerivedOutputs(structs, deviations, bands, fields)
+
+
 @make_lazy
 def simple_moving_average(
     ohlc_df: pl.LazyFrame,
-    period: int = 20,
+    period: int | str | list[int | str] = 20,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
+    time_column: str | None = None,
 ) -> pl.LazyFrame:
     """Calculates the moving average of a dataframe.
 
@@ -97,58 +417,129 @@ def simple_moving_average(
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
-        period (int, optional): Period to use for the moving average.
+        period (int | str | list[int | str], optional): Period to use for the
+            moving average, either a number of rows or a duration such as `"30m"`.
+            Several periods can be given to calculate all of them in one pass.
             Defaults to 20.
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the moving average of all OHLCV columns.
+        pl.LazyFrame: Dataframe containing the moving average of the OHLCV columns.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    suffix = f"_sma_{period}"
-    columns = _get_ohlcv_columns(ohlc_df)
-    expr = pl.col(columns).rolling_mean(period)
-    return _apply_expr(ohlc_df, columns, expr, identifier_column, suffix)
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    expr = _simple_moving_average_exprs(columns, period, time_column)
+    return _apply_expr(
+        ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+    )
 
 
 @make_lazy
 def simple_moving_median(
     ohlc_df: pl.LazyFrame,
-    period: int = 20,
+    period: int | str | list[int | str] = 20,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
+    time_column: str | None = None,
 ) -> pl.LazyFrame:
     """Calculates the moving median of a dataframe.
 
     This requires the DataFrame to already be sorted upon calling this function.
 
+    Medians over duration periods are computed with a `groupby_rolling` per period
+    joined back to the dataframe, which is several times slower than a median over
+    a number of rows.
+
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
-        period (int, optional): Period to use for the moving median.
+        period (int | str | list[int | str], optional): Period to use for the
+            moving median, either a number of rows or a duration such as `"30m"`.
+            Several periods can be given to calculate all of them in one pass.
             Defaults to 20.
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the moving median of all OHLCV columns.
+        pl.LazyFrame: Dataframe containing the moving median of the OHLCV columns.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    suffix = f"_smm_{period}"
-    columns = _get_ohlcv_columns(ohlc_df)
-    expr = pl.col(columns).rolling_median(period)
-    return _apply_expr(ohlc_df, columns, expr, identifier_column, suffix)
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    periods = _periods(period)
+    expr = _simple_moving_median_exprs(
+        columns, [p for p in periods if not isinstance(p, str)]
+    )
+    durations = [p for p in periods if isinstance(p, str)]
+    computed_columns = []
+    if durations:
+        ohlc_df, computed_columns = _add_time_window_medians(
+            _coerce_ohlcv_columns(ohlc_df, columns),
+            columns,
+            durations,
+            identifier_column,
+            time_column,
+        )
+    return _apply_expr(
+        ohlc_df,
+        columns,
+        expr,
+        identifier_column,
+        sorted_by_identifier,
+        output,
+        computed_columns,
+    )
 
 
 @make_lazy
 def moving_std(
     ohlc_df: pl.LazyFrame,
-    period: int = 20,
+    period: int | str | list[int | str] = 20,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
+    time_column: str | None = None,
 ) -> pl.LazyFrame:
     """Calculates the moving std of a dataframe.
 
@@ -157,28 +548,51 @@ def moving_std(
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
-        period (int, optional): Period to use for the moving std.
+        period (int | str | list[int | str], optional): Period to use for the
+            moving std, either a number of rows or a duration such as `"30m"`.
+            Several periods can be given to calculate all of them in one pass.
             Defaults to 20.
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the moving std of all OHLCV columns.
+        pl.LazyFrame: Dataframe containing the moving std of the OHLCV columns.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    suffix = f"_msd_{period}"
-    columns = _get_ohlcv_columns(ohlc_df)
-    expr = pl.col(columns).rolling_std(period)
-    return _apply_expr(ohlc_df, columns, expr, identifier_column, suffix)
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    expr = _moving_std_exprs(columns, period, time_column)
+    return _apply_expr(
+        ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+    )
 
 
 @make_lazy
 def exponential_moving_average(
     ohlc_df: pl.LazyFrame,
-    period: int = 20,
+    period: int | list[int] = 20,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
 ) -> pl.LazyFrame:
     """Calculates the exponential moving average of a dataframe.
 
@@ -187,21 +601,37 @@ def exponential_moving_average(
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
-        period (int, optional): Period to use for the exponential moving average.
-            Defaults to 20.
+        period (int | list[int], optional): Period to use for the exponential
+            moving average. Several periods can be given to calculate all of them
+            in one pass. Defaults to 20.
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the exponential moving average of all OHLCV
+        pl.LazyFrame: Dataframe containing the exponential moving average of the OHLCV
             columns. Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    suffix = f"_ema_{period}"
-    columns = _get_ohlcv_columns(ohlc_df)
-    expr = pl.col(columns).ewm_mean(span=period)
-    return _apply_expr(ohlc_df, columns, expr, identifier_column, suffix)
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    expr = _exponential_moving_average_exprs(columns, period)
+    return _apply_expr(
+        ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+    )
 
 
 @make_lazy
@@ -218,52 +648,138 @@ def typical_price(
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    tp = ohlc_df.with_columns(
-        ((pl.col("high") + pl.col("low") + pl.col("close")) / 3).alias("typical_price")
-    )
+    tp = ohlc_df.with_columns(typical_price_expr())
     return tp
 
 
 @make_lazy
 def vwap(
     ohlcv_df: pl.LazyFrame,
+    period: int | str | list[int | str] | None = None,
+    identifier_column: str | None = None,
+    session: str | pl.Expr | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
+    time_column: str | None = None,
 ) -> pl.LazyFrame:
     """Calculates the volume weighted average price.
 
+    The price of a row is its typical price. The cumulative vwap is calculated from
+    cumulative sums of price times volume and of volume in a single pass, partitioned
+    by session as well as by instrument if a session is given. The rolling vwap is
+    the ratio of the rolling sums instead.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
     Args:
         ohlcv_df (pl.LazyFrame): Dataframe containing the OHLCV data.
+        period (int | str | list[int | str], optional): Period of a rolling vwap,
+            either a number of rows or a duration such as `"30m"`. Several periods
+            can be given to calculate all of them in one pass. Defaults to None.
+            If None, the vwap is cumulative.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        session (str | pl.Expr, optional): Column or expression of the session of
+            each row, e.g. `pl.col("time").dt.date()` to restart the vwap every
+            day. Defaults to None. Only applies to the cumulative vwap, and cannot
+            be used with `compute_indicators`.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
+        time_column (str, optional): Column of the time of each row, which duration
+            periods are windows over. Defaults to None. Rows of each instrument must
+            be sorted by it.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the volume weighted average price.
+        pl.LazyFrame: Dataframe containing the volume weighted average price, named
+            `vwap`, or `vwap_{period}` for a rolling vwap.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    ...
+    schema = get_schema(ohlcv_df)
+    columns = _get_ohlcv_columns(
+        ohlcv_df, [c for c in OHLCV_COLUMNS if c in VWAP_COLUMNS or c in schema]
+    )
+    if session is None:
+        expr = _vwap_exprs(columns, period, time_column=time_column)
+        return _apply_expr(
+            ohlcv_df, columns, expr, identifier_column, sorted_by_identifier, output
+        )
+    expr = vwap_expr(period, identifier_column, session)
+    ohlcv_df = _coerce_ohlcv_columns(ohlcv_df, columns).with_columns(expr)
+    return _apply_expr(
+        ohlcv_df,
+        columns,
+        [],
+        identifier_column,
+        sorted_by_identifier,
+        output,
+        ["vwap"],
+    )
 
 
 @make_lazy
 def rsi(
     ohlc_df: pl.LazyFrame,
-    period: int = 14,
+    period: int | list[int] = 14,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    adjust: bool = True,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
 ) -> pl.LazyFrame:
     """Calculates the relative strength index.
 
+    Gains and losses are smoothed with Wilder's moving average, an exponential
+    moving average with `alpha = 1 / period`.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
-        period (int, optional): Period to use for the relative strength index.
-            Defaults to 14.
+        period (int | list[int], optional): Period to use for the relative strength
+            index. Several periods can be given to calculate all of them in one
+            pass. Defaults to 14.
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used.
+        adjust (bool, optional): Whether to use the adjusted weights of `ewm_mean`,
+            as finta does. Defaults to True. Wilder's original recursion is
+            `adjust=False`.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
 
     Returns:
         pl.LazyFrame: Dataframe containing the relative strength index.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    ...
+    columns = _get_ohlcv_columns(ohlc_df, columns or OHLC_COLUMNS)
+    expr = _rsi_exprs(columns, period, adjust)
+    return _apply_expr(
+        ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+    )
 
 
 @make_lazy
@@ -272,10 +788,20 @@ def bbands(
     period: int = 20,
     std: float = 2.0,
     identifier_column: str | None = None,
-    ma_func: Callable[[pl.Series], pl.Series] = simple_moving_average,
+    ma_func: Callable[[str, int], pl.Expr] | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
 ) -> pl.LazyFrame:
     """Calculates the bollinger bands.
 
+    The window over the identifier column only evaluates the moving mean of each
+    column and of its square, which are the two rolling sums the middle band and the
+    moving std are both derived from. The bands are then computed from them row by
+    row, outside of the window.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
     Args:
         ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
             Volume can optionally be included.
@@ -286,15 +812,42 @@ def bbands(
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
-        ma_func (Callable[[pl.Series], pl.Series], optional): Function to use for
-            calculating the moving average. Defaults to simple_moving_average.
+        ma_func (Callable[[str, int], pl.Expr], optional): Expression factory of
+            a moving average to use as middle band instead of the simple moving
+            average, called with a column and the period, e.g. `ema_expr`. It is
+            evaluated in the same window. Defaults to None.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
 
     Returns:
-        pl.LazyFrame: Dataframe containing the bollinger bands.
+        pl.LazyFrame: Dataframe containing the upper, middle and lower bands of each
+            column, named with the `_bbands_{period}_upper`, `_bbands_{period}_middle`
+            and `_bbands_{period}_lower` suffixes.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    ...
+    columns = _get_ohlcv_columns(ohlc_df, columns or OHLC_COLUMNS)
+    params = {"period": period, "std": std, "ma_func": ma_func}
+    ohlc_df = _apply_expr(
+        ohlc_df,
+        columns,
+        _bbands_exprs(columns, **params),
+        identifier_column,
+        sorted_by_identifier,
+        output,
+    )
+    return _derive_outputs(ohlc_df, _bbands_outputs(columns, **params))
 
 
 @make_lazy
@@ -304,6 +857,9 @@ def macd(
     slow_period: int = 26,
     signal_period: int = 9,
     identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    sorted_by_identifier: bool = False,
+    output: str = "full",
 ) -> pl.LazyFrame:
     """Calculates the moving average convergence divergence.
 
@@ -319,20 +875,221 @@ def macd(
         identifier_column (str, optional): Column to use as an identifier of instrument
             in the dataframe. Defaults to None. If None, the dataframe is assumed to
             contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
 
     Returns:
         pl.LazyFrame: Dataframe containing the moving average convergence divergence.
             Other columns are returned as they were given.
             This makes it convenient to join commands.
     """
-    suffix = f"_macd_{fast_period}_{slow_period}"
-    columns = OHLC_COLUMNS
-    expr = [
-        pl.col(col).ewm_mean(span=slow_period) - pl.col(col).ewm_mean(span=fast_period)
-        for col in columns
-    ]
-    out = _apply_expr(ohlc_df, columns, expr, identifier_column, suffix)
-    expr = [pl.col(c + suffix).ewm_mean(span=signal_period) for c in columns]
-    expr = _add_identifier_over_to_expr(expr, identifier_column)
-    expr = [e.suffix("_signal") for e in expr]
-    return out.with_columns(expr)
+    columns = _get_ohlcv_columns(ohlc_df, columns or OHLC_COLUMNS)
+    expr = _macd_exprs(columns, fast_period, slow_period, signal_period)
+    return _apply_expr(
+        ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+    )
+
+
+IndicatorSpec = Callable[..., pl.LazyFrame] | tuple[Callable[..., pl.LazyFrame], dict]
+
+# Maps each public indicator function to the builder of its expressions and
+# whether the volume column (when present) is part of its input columns.
+_INDICATOR_EXPRS: dict[Callable, tuple[Callable[..., list[pl.Expr]], bool]] = {
+    simple_moving_average: (_simple_moving_average_exprs, True),
+    simple_moving_median: (_simple_moving_median_exprs, True),
+    moving_std: (_moving_std_exprs, True),
+    exponential_moving_average: (_exponential_moving_average_exprs, True),
+    macd: (_macd_exprs, False),
+    vwap: (_vwap_exprs, True),
+    rsi: (_rsi_exprs, False),
+    bbands: (_bbands_exprs, False),
+}
+
+# Maps the indicator functions whose window expressions are struct columns to the
+# builder of the expressions deriving their outputs, see `_DerivedOutputs`.
+_INDICATOR_OUTPUTS: dict[Callable, Callable[..., _DerivedOutputs]] = {
+    bbands: _bbands_outputs,
+}
+
+
+def _expand_indicator_specs(indicators: list[IndicatorSpec]) -> list[IndicatorSpec]:
+    """Split indicator specs with several periods into one spec per period."""
+    expanded = []
+    for spec in indicators:
+        func, params = spec if isinstance(spec, tuple) else (spec, {})
+        if "period" not in params:
+            expanded.append(spec)
+            continue
+        expanded.extend(
+            (func, {**params, "period": p}) for p in _periods(params["period"])
+        )
+    return expanded
+
+
+def _resolve_indicator_spec(
+    spec: IndicatorSpec,
+) -> tuple[Callable[..., list[pl.Expr]], bool, dict]:
+    """Resolve an indicator spec to its expression builder and parameters."""
+    func, params = spec if isinstance(spec, tuple) else (spec, {})
+    if func not in _INDICATOR_EXPRS:
+        raise ValueError(f"{func} cannot be used with compute_indicators.")
+    builder, include_volume = _INDICATOR_EXPRS[func]
+    return builder, include_volume, params
+
+
+def _build_indicator_exprs(
+    columns: list[str], indicators: list[IndicatorSpec]
+) -> list[pl.Expr]:
+    """Build the expressions of several indicators on the given OHLCV columns."""
+    price_columns = [c for c in columns if c in OHLC_COLUMNS]
+    expr = []
+    for spec in indicators:
+        builder, include_volume, params = _resolve_indicator_spec(spec)
+        expr.extend(builder(columns if include_volume else price_columns, **params))
+    return expr
+
+
+def _build_indicator_outputs(
+    columns: list[str], indicators: list[IndicatorSpec]
+) -> _DerivedOutputs:
+    """Build the expressions deriving the outputs of several indicators."""
+    price_columns = [c for c in columns if c in OHLC_COLUMNS]
+    derived = _DerivedOutputs([], [], [], [])
+    for spec in indicators:
+        func = spec[0] if isinstance(spec, tuple) else spec
+        if func not in _INDICATOR_OUTPUTS:
+            continue
+        _, include_volume, params = _resolve_indicator_spec(spec)
+        outputs = _INDICATOR_OUTPUTS[func](
+            columns if include_volume else price_columns, **params
+        )
+        for values, more in zip(derived, outputs):
+            values.extend(more)
+    return derived
+
+
+@make_lazy
+def compute_indicators(
+    ohlc_df: pl.LazyFrame,
+    indicators: list[IndicatorSpec],
+    identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    precision: str | None = None,
+    coerce: bool | None = None,
+    sorted_by_identifier: bool = False,
+    categorical_identifier: bool | None = None,
+    output: str = "full",
+) -> pl.LazyFrame:
+    """Calculates several indicators in a single pass over a dataframe.
+
+    All indicator expressions are added to one `select`, so the OHLCV columns are
+    scanned once and every window over the identifier column is evaluated in the
+    same pass. This is equivalent to calling each indicator function and joining
+    the results, without the join. The columns of `bbands` come after the columns of
+    the other indicators.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
+    Args:
+        ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
+            Volume can optionally be included.
+        indicators (list[IndicatorSpec]): Indicators to calculate. Each entry is
+            either an indicator function, e.g. `simple_moving_average`, or a tuple
+            of an indicator function and a dict of its keyword arguments, e.g.
+            `(macd, {"fast_period": 6})`.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        precision (str, optional): Precision to compute the indicators in, either
+            "float64" or "float32". Defaults to None. If None, the precision set in
+            `finta_polars.config` is used.
+        coerce (bool, optional): Whether to cast OHLCV columns of unexpected numeric
+            dtypes within the query plan instead of raising an error. Defaults to
+            None. If None, the schema coercion set in `finta_polars.config` is used.
+        sorted_by_identifier (bool, optional): Whether the rows of each instrument are
+            contiguous in the dataframe, e.g. because it is sorted by identifier.
+            Defaults to False. If True, the instruments are partitioned as slices of
+            consecutive rows, which is faster than hashing the identifier. Results
+            are wrong if the rows of an instrument are not contiguous.
+        categorical_identifier (bool, optional): Whether to cast a Utf8 identifier
+            column to Categorical at the start of the query and return it as
+            Categorical. Defaults to None. If None, the setting in
+            `finta_polars.config` is used.
+        output (str, optional): Columns to return. Defaults to "full", which returns
+            the indicator columns and every column other than the OHLCV columns.
+            "lean" returns the indicator columns with the identifier column and a
+            `row_nr` row index, or the `row_nr` column of the dataframe if it has
+            one. "append" returns every column of the dataframe with the indicator
+            columns added.
+
+    Returns:
+        pl.LazyFrame: Dataframe containing the columns of every requested indicator.
+            Other columns are returned as they were given.
+            This makes it convenient to join commands.
+    """
+    if coerce is None:
+        coerce = get_schema_coercion()
+    if categorical_identifier is None:
+        categorical_identifier = get_categorical_identifier()
+    with (
+        use_precision(precision or get_precision()),
+        use_schema_coercion(coerce),
+        use_categorical_identifier(categorical_identifier),
+    ):
+        columns = _get_ohlcv_columns(ohlc_df, columns)
+        expr = _build_indicator_exprs(columns, indicators)
+        ohlc_df = _apply_expr(
+            ohlc_df, columns, expr, identifier_column, sorted_by_identifier, output
+        )
+        return _derive_outputs(ohlc_df, _build_indicator_outputs(columns, indicators))
+
+
+def collect_indicators(
+    indicator_dfs: list[pl.LazyFrame],
+    how: str = "list",
+) -> list[pl.DataFrame] | pl.DataFrame:
+    """Collects the outputs of several indicator functions together.
+
+    The LazyFrames are executed with `pl.collect_all`, so they run in parallel and
+    subplans they have in common, such as a cached scan of the source, are shared.
+    Calculating the indicators in a single pass with `compute_indicators` is faster
+    still when the code building them can be restructured.
+
+    Args:
+        indicator_dfs (list[pl.LazyFrame]): Outputs of indicator functions called on
+            a common source.
+        how (str, optional): Either "list" to return the collected dataframes, or
+            "horizontal" to return them as one dataframe aligned by row.
+            Defaults to "list". For "horizontal", the dataframes must have the rows of
+            the source in the same order, and columns already in a previous
+            dataframe, such as the identifier column, are only kept once.
+
+    Returns:
+        list[pl.DataFrame] | pl.DataFrame: The collected dataframes, or one dataframe
+            with the columns of all of them.
+    """
+    if how not in ("list", "horizontal"):
+        raise ValueError(f"how must be 'list' or 'horizontal', got {how!r}.")
+    dfs = pl.collect_all(indicator_dfs)
+    if how == "list":
+        return dfs
+    seen = set()
+    aligned = []
+    for df in dfs:
+        aligned.append(df.select([c for c in df.columns if c not in seen]))
+        seen.update(df.columns)
+    return pl.concat(aligned, how="horizontal")
@@ -0,0 +1,256 @@
+"""Registration of the `ta` namespace on polars expressions and LazyFrames.
+
+Importing `finta_polars` registers the namespaces, so indicators can be written inline
+in a query, e.g. `pl.col("close").ta.ema(20)` or `lf.ta.macd(identifier_column="id")`.
+"""
+from typing import Callable
+
+import polars as pl
+
+from finta_polars.expressions import (
+    bbands_exprs,
+    ema_expr,
+    macd_exprs,
+    msd_expr,
+    rsi_expr,
+    sma_expr,
+    smm_expr,
+    vwap_expr,
+)
+from finta_polars.indicators import (
+    VWAP_COLUMNS,
+    IndicatorSpec,
+    _add_identifier_over_to_expr,
+    _build_indicator_exprs,
+    _build_indicator_outputs,
+    _coerce_ohlcv_columns,
+    _derive_outputs,
+    _encode_identifier,
+    _get_ohlcv_columns,
+    bbands,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    rsi,
+    simple_moving_average,
+    simple_moving_median,
+)
+
+
+@pl.api.register_expr_namespace("ta")
+class IndicatorExprNamespace:
+    """Indicators of an expression, available as `expr.ta`.
+
+    Each method calls the factory of the same indicator in `finta_polars.expressions`.
+    """
+
+    def __init__(self, expr: pl.Expr):
+        """Wrap the expression the indicators are calculated on."""
+        self._expr = expr
+
+    def sma(
+        self,
+        period: int | str = 20,
+        identifier_column: str | None = None,
+        time_column: str | None = None,
+    ) -> pl.Expr:
+        """Simple moving average, see `sma_expr`."""
+        return sma_expr(self._expr, period, identifier_column, time_column)
+
+    def smm(self, period: int = 20, identifier_column: str | None = None) -> pl.Expr:
+        """Simple moving median, see `smm_expr`."""
+        return smm_expr(self._expr, period, identifier_column)
+
+    def msd(
+        self,
+        period: int | str = 20,
+        identifier_column: str | None = None,
+        time_column: str | None = None,
+    ) -> pl.Expr:
+        """Moving std, see `msd_expr`."""
+        return msd_expr(self._expr, period, identifier_column, time_column)
+
+    def ema(self, period: int = 20, identifier_column: str | None = None) -> pl.Expr:
+        """Exponential moving average, see `ema_expr`."""
+        return ema_expr(self._expr, period, identifier_column)
+
+    def macd(
+        self,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        identifier_column: str | None = None,
+    ) -> list[pl.Expr]:
+        """Moving average convergence divergence and signal line, see `macd_exprs`."""
+        return macd_exprs(
+            self._expr, fast_period, slow_period, signal_period, identifier_column
+        )
+
+    def bbands(
+        self,
+        period: int = 20,
+        std: float = 2.0,
+        identifier_column: str | None = None,
+    ) -> list[pl.Expr]:
+        """Upper, middle and lower bollinger bands, see `bbands_exprs`."""
+        return bbands_exprs(self._expr, period, std, identifier_column)
+
+    def rsi(
+        self,
+        period: int = 14,
+        identifier_column: str | None = None,
+        adjust: bool = True,
+    ) -> pl.Expr:
+        """Relative strength index, see `rsi_expr`."""
+        return rsi_expr(self._expr, period, identifier_column, adjust)
+
+    def vwap(
+        self,
+        period: int | str | None = None,
+        identifier_column: str | None = None,
+        session: str | pl.Expr | None = None,
+        time_column: str | None = None,
+    ) -> pl.Expr:
+        """Volume weighted average of the expression as price, see `vwap_expr`."""
+        return vwap_expr(
+            period, identifier_column, session, time_column, price=self._expr
+        )
+
+
+@pl.api.register_lazyframe_namespace("ta")
+class IndicatorFrameNamespace:
+    """Indicators of a LazyFrame containing OHLC data, available as `lf.ta`.
+
+    Unlike the functions in `finta_polars.indicators`, these methods add the indicator
+    columns to the LazyFrame with `with_columns`, so calls can be chained and all
+    indicators stay in the same query plan.
+    """
+
+    def __init__(self, lf: pl.LazyFrame):
+        """Wrap the LazyFrame the indicators are calculated on."""
+        self._lf = lf
+
+    def sma(
+        self,
+        period: int | str | list[int | str] = 20,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+        time_column: str | None = None,
+    ) -> pl.LazyFrame:
+        """Add the simple moving average of the OHLCV columns.
+
+        Duration periods such as `"30m"` are windows over `time_column`.
+        """
+        params = {"period": period, "time_column": time_column}
+        return self.indicators(
+            [(simple_moving_average, params)], identifier_column, columns
+        )
+
+    def smm(
+        self,
+        period: int | list[int] = 20,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pl.LazyFrame:
+        """Add the simple moving median of the OHLCV columns."""
+        return self.indicators(
+            [(simple_moving_median, {"period": period})], identifier_column, columns
+        )
+
+    def msd(
+        self,
+        period: int | str | list[int | str] = 20,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+        time_column: str | None = None,
+    ) -> pl.LazyFrame:
+        """Add the moving std of the OHLCV columns.
+
+        Duration periods such as `"30m"` are windows over `time_column`.
+        """
+        params = {"period": period, "time_column": time_column}
+        return self.indicators([(moving_std, params)], identifier_column, columns)
+
+    def ema(
+        self,
+        period: int | list[int] = 20,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pl.LazyFrame:
+        """Add the exponential moving average of the OHLCV columns."""
+        return self.indicators(
+            [(exponential_moving_average, {"period": period})],
+            identifier_column,
+            columns,
+        )
+
+    def macd(
+        self,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pl.LazyFrame:
+        """Add the moving average convergence divergence of the OHLC columns."""
+        params = {
+            "fast_period": fast_period,
+            "slow_period": slow_period,
+            "signal_period": signal_period,
+        }
+        return self.indicators([(macd, params)], identifier_column, columns)
+
+    def bbands(
+        self,
+        period: int | list[int] = 20,
+        std: float = 2.0,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+        ma_func: Callable[[str, int], pl.Expr] | None = None,
+    ) -> pl.LazyFrame:
+        """Add the upper, middle and lower bollinger bands of the OHLC columns."""
+        params = {"period": period, "std": std, "ma_func": ma_func}
+        return self.indicators([(bbands, params)], identifier_column, columns)
+
+    def rsi(
+        self,
+        period: int | list[int] = 14,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+        adjust: bool = True,
+    ) -> pl.LazyFrame:
+        """Add the relative strength index of the OHLC columns."""
+        params = {"period": period, "adjust": adjust}
+        return self.indicators([(rsi, params)], identifier_column, columns)
+
+    def vwap(
+        self,
+        period: int | str | None = None,
+        identifier_column: str | None = None,
+        session: str | pl.Expr | None = None,
+        time_column: str | None = None,
+    ) -> pl.LazyFrame:
+        """Add the volume weighted average price, see `vwap`.
+
+        Unlike `indicators`, this supports session resets.
+        """
+        columns = _get_ohlcv_columns(self._lf, VWAP_COLUMNS)
+        lf = _encode_identifier(self._lf, identifier_column)
+        return _coerce_ohlcv_columns(lf, columns).with_columns(
+            vwap_expr(period, identifier_column, session, time_column)
+        )
+
+    def indicators(
+        self,
+        indicators: list[IndicatorSpec],
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pl.LazyFrame:
+        """Add several indicators in one `with_columns`, see `compute_indicators`."""
+        columns = _get_ohlcv_columns(self._lf, columns)
+        expr = _build_indicator_exprs(columns, indicators)
+        lf = _encode_identifier(self._lf, identifier_column)
+        lf = _coerce_ohlcv_columns(lf, columns).with_columns(
+            _add_identifier_over_to_expr(expr, identifier_column)
+        )
+        return _derive_outputs(lf, _build_indicator_outputs(columns, indicators))
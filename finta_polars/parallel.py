@@ -0,0 +1,153 @@
+"""Parallel computation of indicators over a process pool.
+
+A single query is limited by its largest instruments and by polars running one plan
+at a time. The functions in this module shard the instruments of a dataframe across
+worker processes instead, with shards balanced by row count. Shards are exchanged
+with the workers as Arrow IPC files, which the workers and the parent memory-map
+rather than pickle.
+
+Indicators of an instrument only depend on the rows of that instrument, so the
+output is identical to running the indicators in a single process, in the same
+row order. Workers do not inherit the settings of `finta_polars.config`, so the
+parent passes them on to every shard.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import polars as pl
+
+from finta_polars.config import (
+    get_config,
+    use_categorical_identifier,
+    use_precision,
+    use_schema_coercion,
+)
+from finta_polars.indicators import IndicatorSpec, compute_indicators
+
+_ROW_NR = "__row_nr"
+
+
+def _balance_shards(counts: pl.DataFrame, n_shards: int) -> list[list]:
+    """Assign identifiers to shards with balanced row counts.
+
+    Identifiers are assigned from the largest to the smallest to the shard with the
+    fewest rows so far. Ties are broken by order, so the assignment is deterministic.
+
+    Args:
+        counts (pl.DataFrame): Identifiers and their row counts, in order of first
+            appearance.
+        n_shards (int): Number of shards.
+
+    Returns:
+        list[list]: The identifiers of each non empty shard.
+    """
+    shards = [[] for _ in range(n_shards)]
+    rows = [0] * n_shards
+    order = sorted(range(len(counts)), key=lambda i: -counts["count"][i])
+    for i in order:
+        shard = rows.index(min(rows))
+        shards[shard].append(counts[counts.columns[0]][i])
+        rows[shard] += counts["count"][i]
+    return [shard for shard in shards if shard]
+
+
+def _compute_shard(
+    input_path: Path,
+    output_path: Path,
+    indicators: list[IndicatorSpec],
+    identifier_column: str,
+    columns: list[str] | None,
+    config: dict,
+) -> Path:
+    """Calculate the indicators of one shard in a worker process.
+
+    The configuration of the parent is applied, except for categorical identifiers:
+    categoricals built in separate processes cannot be concatenated, so the parent
+    casts the identifier column once the shards are combined.
+    """
+    df = pl.read_ipc(input_path, memory_map=True)
+    with (
+        use_precision(config["precision"]),
+        use_schema_coercion(config["schema_coercion"]),
+        use_categorical_identifier(False),
+    ):
+        compute_indicators(
+            df, indicators, identifier_column=identifier_column, columns=columns
+        ).collect().write_ipc(output_path)
+    return output_path
+
+
+def compute_indicators_parallel(
+    ohlc_df: pl.DataFrame | pl.LazyFrame,
+    indicators: list[IndicatorSpec],
+    identifier_column: str,
+    columns: list[str] | None = None,
+    max_workers: int | None = None,
+) -> pl.DataFrame:
+    """Calculates several indicators with the instruments sharded across processes.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
+    Args:
+        ohlc_df (pl.DataFrame | pl.LazyFrame): Dataframe containing the OHLC data.
+            Volume can optionally be included.
+        indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+            accepted by `compute_indicators`.
+        identifier_column (str): Column to use as an identifier of instrument in the
+            dataframe.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        max_workers (int, optional): Number of worker processes. Defaults to None.
+            If None, the number of CPUs is used.
+
+    Returns:
+        pl.DataFrame: The same dataframe as `compute_indicators`, collected.
+    """
+    config = get_config()
+    df = ohlc_df.lazy().collect()
+    if df.is_empty():
+        return compute_indicators(
+            df, indicators, identifier_column=identifier_column, columns=columns
+        ).collect()
+    categorical = df[identifier_column].dtype == pl.Categorical
+    if categorical:
+        # Shards are selected by comparing identifiers with their values, which
+        # categoricals only support under a global string cache.
+        df = df.with_columns(pl.col(identifier_column).cast(pl.Utf8))
+    df = df.with_row_count(_ROW_NR)
+    counts = df.groupby(identifier_column, maintain_order=True).agg(pl.count())
+    shards = _balance_shards(counts, max_workers or os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        futures = []
+        # Workers are spawned rather than forked, as polars' thread pool does not
+        # survive a fork.
+        with ProcessPoolExecutor(
+            max_workers=len(shards), mp_context=get_context("spawn")
+        ) as executor:
+            for i, shard in enumerate(shards):
+                input_path = Path(tmp) / f"input-{i}.arrow"
+                df.filter(pl.col(identifier_column).is_in(shard)).write_ipc(input_path)
+                futures.append(
+                    executor.submit(
+                        _compute_shard,
+                        input_path,
+                        Path(tmp) / f"output-{i}.arrow",
+                        indicators,
+                        identifier_column,
+                        columns,
+                        config,
+                    )
+                )
+            outputs = [future.result() for future in futures]
+        out = pl.concat([pl.read_ipc(path, memory_map=True) for path in outputs])
+        out = out.sort(_ROW_NR).drop(_ROW_NR)
+    if categorical or (
+        config["categorical_identifier"] and out[identifier_column].dtype == pl.Utf8
+    ):
+        out = out.with_columns(pl.col(identifier_column).cast(pl.Categorical))
+    return out
@@ -0,0 +1,277 @@
+"""Out-of-core computation of indicators from Parquet to Parquet.
+
+Window functions cannot run in polars' streaming engine, so a dataset larger than
+memory cannot be passed to the indicator functions in one query. Instead, the
+functions in this module read the dataset in chunks of whole instruments, calculate
+the indicators of each chunk and write it to its own Parquet file. Instruments with
+more rows than fit in a chunk are split into slices of consecutive rows, and the
+indicators of each slice are continued from the state of the previous ones with
+`append_indicators`, so the overlap with the previous slice is exactly the history
+the indicators need.
+
+Peak memory is bounded by the number of rows in a chunk, whatever the size of the
+dataset. Reading a chunk of instruments filters the dataset on the identifier, which
+skips row groups by their statistics when the files are sorted by identifier, and
+skips whole directories when the dataset is hive-partitioned by identifier. The
+slices of an instrument are read from a single pass of record batches with
+`pyarrow.dataset`, so each row is read once however many slices it is split into.
+"""
+import glob
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from finta_polars.incremental import append_indicators, indicator_state
+from finta_polars.indicators import IndicatorSpec, compute_indicators
+
+PART_FILE = "part-{:05d}.parquet"
+
+
+def _hive_partitions(
+    source: str | Path, identifier_column: str
+) -> dict[str, pl.LazyFrame] | None:
+    """Get the scan of each partition of a dataset hive-partitioned by identifier.
+
+    Returns:
+        dict[str, pl.LazyFrame] | None: Maps each identifier to the scan of its
+            partition, with the identifier added as a column. None if the source is
+            not a directory of `{identifier_column}={value}` partitions.
+    """
+    source = Path(source)
+    if not source.is_dir():
+        return None
+    prefix = f"{identifier_column}="
+    partitions = sorted(p for p in source.iterdir() if p.name.startswith(prefix))
+    if not partitions:
+        return None
+    return {
+        p.name[len(prefix) :]: pl.scan_parquet(p / "**/*.parquet").with_columns(
+            pl.lit(p.name[len(prefix) :]).alias(identifier_column)
+        )
+        for p in partitions
+    }
+
+
+def _scan(source: str | Path | pl.LazyFrame) -> pl.LazyFrame:
+    """Scan a Parquet source given as a path, glob, directory or LazyFrame."""
+    if isinstance(source, pl.LazyFrame):
+        return source
+    if Path(source).is_dir():
+        return pl.scan_parquet(Path(source) / "**/*.parquet")
+    return pl.scan_parquet(source)
+
+
+def _pack_chunks(counts: pl.DataFrame, chunk_rows: int) -> list[tuple[list, int]]:
+    """Pack consecutive identifiers into chunks of at most `chunk_rows` rows.
+
+    An identifier with more rows than `chunk_rows` gets a chunk of its own.
+
+    Returns:
+        list[tuple[list, int]]: The identifiers and number of rows of each chunk.
+    """
+    chunks = []
+    for identifier, count in counts.iter_rows():
+        if not chunks or chunks[-1][1] + count > chunk_rows:
+            chunks.append(([], 0))
+        chunks[-1] = ([*chunks[-1][0], identifier], chunks[-1][1] + count)
+    return chunks
+
+
+def _dataset(source: str | Path) -> ds.Dataset:
+    """Open a Parquet source given as a path, glob or directory with pyarrow."""
+    if Path(source).is_file():
+        return ds.dataset(source, format="parquet")
+    if Path(source).is_dir():
+        source = Path(source) / "**/*.parquet"
+    return ds.dataset(sorted(glob.glob(str(source), recursive=True)), format="parquet")
+
+
+def _iter_slices(
+    dataset: ds.Dataset,
+    chunk_rows: int,
+    predicate: ds.Expression | None = None,
+    identifier: tuple[str, object] | None = None,
+) -> Iterator[pl.DataFrame]:
+    """Read the rows of a dataset in consecutive slices of `chunk_rows` rows.
+
+    The rows are read in one pass of record batches, holding at most one slice and
+    one batch in memory.
+
+    Args:
+        dataset (ds.Dataset): Dataset to read.
+        chunk_rows (int): Number of rows of each slice but the last.
+        predicate (ds.Expression, optional): Filter pushed down to the scan.
+        identifier (tuple[str, object], optional): Name and value of an identifier
+            column to add to every slice, for the partitions of a hive-partitioned
+            dataset.
+    """
+    batches, rows = [], 0
+    for batch in dataset.to_batches(filter=predicate, batch_size=chunk_rows):
+        batches.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_rows:
+            table = pa.Table.from_batches(batches)
+            batches, rows = table.slice(chunk_rows).to_batches(), rows - chunk_rows
+            yield _with_partition(pl.from_arrow(table.slice(0, chunk_rows)), identifier)
+    if rows:
+        yield _with_partition(pl.from_arrow(pa.Table.from_batches(batches)), identifier)
+
+
+def _with_partition(
+    df: pl.DataFrame, identifier: tuple[str, object] | None
+) -> pl.DataFrame:
+    """Add the identifier column of a hive partition to a slice of its rows."""
+    if identifier is None:
+        return df
+    return df.with_columns(pl.lit(identifier[1]).alias(identifier[0]))
+
+
+def _read_chunks(
+    source: str | Path | pl.LazyFrame,
+    identifier_column: str | None,
+    chunk_rows: int,
+) -> Iterator[tuple[bool, Iterator[pl.DataFrame]]]:
+    """Read a dataset in chunks of whole instruments.
+
+    Yields:
+        tuple[bool, Iterator[pl.DataFrame]]: Whether the chunk is a single instrument
+            split into several slices, and the consecutive slices of the rows of the
+            chunk. The slices of a chunk are read lazily, one at a time.
+    """
+    partitions = None
+    if identifier_column is not None and not isinstance(source, pl.LazyFrame):
+        partitions = _hive_partitions(source, identifier_column)
+
+    if partitions is not None:
+        counts = pl.DataFrame(
+            {
+                identifier_column: list(partitions),
+                "count": [
+                    scan.select(pl.count()).collect().item()
+                    for scan in partitions.values()
+                ],
+            }
+        )
+    elif identifier_column is not None:
+        scan = _scan(source)
+        counts = (
+            scan.groupby(identifier_column)
+            .agg(pl.count())
+            .sort(identifier_column)
+            .collect(streaming=True)
+        )
+    else:
+        scan = _scan(source)
+        counts = pl.DataFrame({"count": [scan.select(pl.count()).collect().item()]})
+        counts = counts.select(pl.lit(None).alias("identifier"), "count")
+
+    for chunk, count in _pack_chunks(counts, chunk_rows):
+        if count <= chunk_rows:
+            if partitions is not None:
+                lf = pl.concat([partitions[identifier] for identifier in chunk])
+            elif identifier_column is not None:
+                # A range rather than `is_in`, so row group statistics can be used.
+                identifier = pl.col(identifier_column)
+                lf = scan.filter(
+                    identifier.is_between(pl.lit(chunk[0]), pl.lit(chunk[-1]))
+                    & identifier.is_in(chunk)
+                )
+            else:
+                lf = scan
+            yield False, iter([lf.collect(streaming=True)])
+        elif isinstance(source, pl.LazyFrame):
+            # A LazyFrame cannot be read in batches, so each slice runs its query.
+            lf = (
+                scan
+                if identifier_column is None
+                else scan.filter(pl.col(identifier_column) == chunk[0])
+            )
+            yield True, (
+                lf.slice(offset, chunk_rows).collect(streaming=True)
+                for offset in range(0, count, chunk_rows)
+            )
+        elif partitions is not None:
+            partition = Path(source) / f"{identifier_column}={chunk[0]}"
+            yield True, _iter_slices(
+                _dataset(partition / "**/*.parquet"),
+                chunk_rows,
+                identifier=(identifier_column, chunk[0]),
+            )
+        elif identifier_column is not None:
+            yield True, _iter_slices(
+                _dataset(source), chunk_rows, ds.field(identifier_column) == chunk[0]
+            )
+        else:
+            yield True, _iter_slices(_dataset(source), chunk_rows)
+
+
+def compute_indicators_parquet(
+    source: str | Path | pl.LazyFrame,
+    destination: str | Path,
+    indicators: list[IndicatorSpec],
+    identifier_column: str | None = None,
+    columns: list[str] | None = None,
+    chunk_rows: int = 1_000_000,
+) -> list[Path]:
+    """Calculates indicators of a Parquet dataset larger than memory.
+
+    The dataset is processed in chunks of at most `chunk_rows` rows, so peak memory
+    is roughly `chunk_rows` times the size of a row of input and output, plus the
+    few rows of history kept per instrument between the slices of an instrument.
+
+    Rows of each instrument must be sorted in time. Instruments are written in order
+    of identifier, each with its rows in the order of the dataset. The output equals
+    `compute_indicators` on the whole dataset, except that the moving averages and
+    stds of instruments split into several slices carry the rounding of
+    `append_indicators`, on the order of 1e-12 relative to the values.
+
+    Args:
+        source (str | Path | pl.LazyFrame): Parquet file, glob, directory or
+            `pl.scan_parquet` LazyFrame containing the OHLC data. A directory of
+            `{identifier_column}={value}` subdirectories is read one partition per
+            instrument. A LazyFrame cannot be read in batches, so each slice of an
+            instrument longer than `chunk_rows` runs its query again; pass a path
+            to read such instruments in one pass. Volume can optionally be included.
+        destination (str | Path): Directory to write the Parquet files to. It is
+            created if it does not exist.
+        indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+            accepted by `compute_indicators`.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+        chunk_rows (int, optional): Maximum number of rows held in memory at once.
+            Defaults to 1_000_000.
+
+    Returns:
+        list[Path]: Parquet files written, one per chunk or slice of an instrument,
+            which can be read back in order with
+            `pl.scan_parquet(destination / "*.parquet")`.
+    """
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for split, slices in _read_chunks(source, identifier_column, chunk_rows):
+        state = None
+        for df in slices:
+            if split and state is None:
+                state = indicator_state(
+                    df.head(0), indicators, identifier_column, columns
+                )
+            if state is None:
+                out = compute_indicators(
+                    df, indicators, identifier_column=identifier_column, columns=columns
+                ).collect()
+            else:
+                out, state = append_indicators(
+                    state, df, indicators, identifier_column, columns
+                )
+            path = destination / PART_FILE.format(len(paths))
+            out.write_parquet(path)
+            paths.append(path)
+    return paths
@@ -0,0 +1,129 @@
+"""Indicator plans compiled once and reused across many inputs.
+
+Calling an indicator function validates the schema of its input and builds its
+expressions on every call, which dominates the run time on small inputs. An
+`IndicatorPlan` does this work once for a schema, and only checks the schema of each
+input it is run on before evaluating the prebuilt expressions.
+"""
+import polars as pl
+
+from finta_polars.config import get_categorical_identifier, get_schema_coercion
+from finta_polars.indicators import (
+    IndicatorSpec,
+    _add_identifier_over_to_expr,
+    _build_indicator_exprs,
+    _build_indicator_outputs,
+    _derive_outputs,
+    _get_ohlcv_columns,
+)
+from finta_polars.schemas import PolarsSchemaError, get_schema, indicator_schema_casts
+
+
+class IndicatorPlan:
+    """Indicators compiled for dataframes of one schema.
+
+    The plan is built with the precision, schema coercion and categorical identifier
+    settings of `finta_polars.config` at the time it is created.
+
+    Examples:
+        >>> plan = IndicatorPlan([simple_moving_average, macd], frames[0].schema)
+        >>> outputs = [plan(df) for df in frames]
+    """
+
+    def __init__(
+        self,
+        indicators: list[IndicatorSpec],
+        schema: dict | pl.DataFrame | pl.LazyFrame,
+        identifier_column: str | None = None,
+        columns: list[str] | None = None,
+        sorted_by_identifier: bool = False,
+    ):
+        """Compile indicators for a schema.
+
+        Args:
+            indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+                accepted by `compute_indicators`.
+            schema (dict | pl.DataFrame | pl.LazyFrame): Schema of the dataframes the
+                plan is run on, or a dataframe with that schema.
+            identifier_column (str, optional): Column to use as an identifier of
+                instrument in the dataframe. Defaults to None. If None, the dataframe
+                is assumed to contain data for only one instrument.
+            columns (list[str], optional): OHLCV columns to restrict the computation
+                to. Defaults to None. If None, all OHLC columns are used, and volume
+                if the dataframe contains it.
+            sorted_by_identifier (bool, optional): Whether the rows of each
+                instrument are contiguous in the dataframe, see `compute_indicators`.
+                Defaults to False.
+        """
+        if not isinstance(schema, dict):
+            schema = get_schema(schema)
+        self.schema = dict(schema)
+        template = pl.DataFrame(schema=self.schema).lazy()
+        self.columns = _get_ohlcv_columns(template, columns)
+
+        self._casts = []
+        if get_schema_coercion():
+            self._casts += indicator_schema_casts(template, columns=self.columns)
+        if (
+            identifier_column is not None
+            and get_categorical_identifier()
+            and self.schema.get(identifier_column) == pl.Utf8
+        ):
+            self._casts.append(pl.col(identifier_column).cast(pl.Categorical))
+
+        expr = _build_indicator_exprs(self.columns, indicators)
+        self._exprs = [
+            pl.all().exclude(self.columns),
+            *_add_identifier_over_to_expr(
+                expr, identifier_column, sorted_by_identifier
+            ),
+        ]
+        self._outputs = _build_indicator_outputs(self.columns, indicators)
+
+    def _check_schema(self, schema: dict) -> None:
+        if schema != self.schema:
+            raise PolarsSchemaError(
+                f"""
+                Schema of dataframe does not match the schema of the plan.
+                Expected: {self.schema},
+                Actual: {schema}
+                """
+            )
+
+    def bind(self, ohlc_df: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+        """Apply the plan to a dataframe without executing it.
+
+        Args:
+            ohlc_df (pl.DataFrame | pl.LazyFrame): Dataframe with the schema of the
+                plan.
+
+        Returns:
+            pl.LazyFrame: The same dataframe as `compute_indicators`.
+
+        Raises:
+            PolarsSchemaError: If the schema of the dataframe is not the schema of the
+                plan.
+        """
+        self._check_schema(get_schema(ohlc_df))
+        lf = ohlc_df.lazy()
+        if self._casts:
+            lf = lf.with_columns(self._casts)
+        return _derive_outputs(lf.select(self._exprs), self._outputs)
+
+    def __call__(self, ohlc_df: pl.DataFrame) -> pl.DataFrame:
+        """Execute the plan on a dataframe.
+
+        Args:
+            ohlc_df (pl.DataFrame): Dataframe with the schema of the plan.
+
+        Returns:
+            pl.DataFrame: The same dataframe as `compute_indicators`, collected.
+
+        Raises:
+            PolarsSchemaError: If the schema of the dataframe is not the schema of the
+                plan.
+        """
+        self._check_schema(ohlc_df.schema)
+        if self._casts:
+            ohlc_df = ohlc_df.with_columns(self._casts)
+        return _derive_outputs(ohlc_df.select(self._exprs), self._outputs)
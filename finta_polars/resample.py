@@ -0,0 +1,118 @@
+"""Resampling of trade ticks and bars into OHLCV bars.
+
+Bars are aggregated with `groupby_dynamic` in a LazyFrame with the schema the
+indicator functions expect, so the resampling and the indicators run as a single
+query plan without materializing the bars, e.g.
+
+    bars = resample_ticks(ticks, "1m", identifier_column="ticker")
+    simple_moving_average(bars, identifier_column="ticker").collect()
+"""
+import polars as pl
+
+from finta_polars.schemas import INDICATOR_VOLUME_SCHEMA, get_schema
+
+
+def resample_ticks(
+    ticks_df: pl.DataFrame | pl.LazyFrame,
+    every: str,
+    identifier_column: str | None = None,
+    time_column: str = "time",
+    price_column: str = "price",
+    size_column: str = "size",
+    offset: str | None = None,
+) -> pl.LazyFrame:
+    """Aggregates trade ticks into OHLCV bars on a time grid.
+
+    Ticks of each instrument must be sorted by time. Bars are labelled with the start
+    of their window and only created for windows with at least one tick, so bars of
+    an instrument with gaps in its trading are irregularly spaced.
+
+    Args:
+        ticks_df (pl.DataFrame | pl.LazyFrame): Dataframe containing one row per
+            trade.
+        every (str): Duration of the bars, e.g. "1m" or "1h".
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        time_column (str, optional): Column of the time of each trade.
+            Defaults to "time".
+        price_column (str, optional): Column of the price of each trade.
+            Defaults to "price".
+        size_column (str, optional): Column of the size of each trade.
+            Defaults to "size".
+        offset (str, optional): Offset of the time grid, e.g. "30m" to start hourly
+            bars on the half hour. Defaults to None.
+
+    Returns:
+        pl.LazyFrame: Dataframe with the identifier column, the time column labelling
+            the start of each bar and the OHLCV columns, in the dtypes of
+            `INDICATOR_VOLUME_SCHEMA`. The bars of each instrument are contiguous
+            and sorted by time.
+    """
+    price = pl.col(price_column)
+    ohlcv = {
+        "open": price.first(),
+        "high": price.max(),
+        "low": price.min(),
+        "close": price.last(),
+        "volume": pl.col(size_column).sum(),
+    }
+    return (
+        ticks_df.lazy()
+        .groupby_dynamic(time_column, every=every, offset=offset, by=identifier_column)
+        .agg(
+            [
+                expr.cast(INDICATOR_VOLUME_SCHEMA[name]).alias(name)
+                for name, expr in ohlcv.items()
+            ]
+        )
+    )
+
+
+# Aggregation of each OHLCV column of the bars in a window into a coarser bar.
+_BAR_AGGREGATIONS = {
+    "open": pl.Expr.first,
+    "high": pl.Expr.max,
+    "low": pl.Expr.min,
+    "close": pl.Expr.last,
+    "volume": pl.Expr.sum,
+}
+
+
+def resample_bars(
+    ohlc_df: pl.DataFrame | pl.LazyFrame,
+    every: str,
+    identifier_column: str | None = None,
+    time_column: str = "time",
+    columns: list[str] | None = None,
+    offset: str | None = None,
+) -> pl.LazyFrame:
+    """Aggregates OHLCV bars into bars of a longer duration, e.g. minutes into days.
+
+    Bars of each instrument must be sorted by time. Bars are labelled with the start
+    of their window and only created for windows with at least one bar.
+
+    Args:
+        ohlc_df (pl.DataFrame | pl.LazyFrame): Dataframe containing the OHLC data.
+            Volume can optionally be included.
+        every (str): Duration of the aggregated bars, e.g. "1d" or "1w".
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        time_column (str, optional): Column of the time of each bar.
+            Defaults to "time".
+        columns (list[str], optional): OHLCV columns to aggregate. Defaults to None.
+            If None, the OHLC columns are aggregated, and volume if the dataframe
+            contains it.
+        offset (str, optional): Offset of the time grid. Defaults to None.
+
+    Returns:
+        pl.LazyFrame: Dataframe with the identifier column, the time column labelling
+            the start of each bar and the aggregated OHLCV columns.
+    """
+    ohlc_df = ohlc_df.lazy()
+    if columns is None:
+        columns = [c for c in _BAR_AGGREGATIONS if c in get_schema(ohlc_df)]
+    return ohlc_df.groupby_dynamic(
+        time_column, every=every, offset=offset, by=identifier_column
+    ).agg([_BAR_AGGREGATIONS[c](pl.col(c)) for c in columns])
@@ -1,7 +1,12 @@
 """Module containing schema validation code for the finta_polars package."""
 
+import weakref
+from functools import lru_cache
+
 import polars as pl
 
+from finta_polars.config import PRECISIONS, get_precision
+
 INDICATOR_SCHEMA = {
     "open": pl.Float64,
     "high": pl.Float64,
@@ -19,6 +24,15 @@ INDICATOR_VOLUME_SCHEMA = {
 INDICATOR_VOLUME_SCHEMA_INT = INDICATOR_VOLUME_SCHEMA.copy()
 INDICATOR_VOLUME_SCHEMA_INT["volume"] = pl.Int64
 
+INDICATOR_SCHEMA_FLOAT32 = {c: pl.Float32 for c in INDICATOR_SCHEMA}
+INDICATOR_VOLUME_SCHEMAS_FLOAT32 = [
+    {**INDICATOR_SCHEMA_FLOAT32, "volume": dtype}
+    for dtype in [pl.Float32, pl.Float64, pl.Int64]
+]
+
+
+_SCHEMA_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
 
 class PolarsSchemaError(Exception):
     """Exception raised when a polars schema is invalid."""
@@ -26,33 +40,158 @@ class PolarsSchemaError(Exception):
     pass
 
 
-def validate_indicator_schema(df: pl.LazyFrame, include_volume: bool = False) -> None:
+def get_schema(df: pl.LazyFrame) -> dict:
+    """Get the schema of a dataframe.
+
+    The schema of a LazyFrame is resolved from its query plan once and cached for as
+    long as the LazyFrame exists, so indicators called repeatedly on the same
+    LazyFrame do not resolve its plan again.
+
+    Args:
+    df (pl.LazyFrame): Dataframe to get the schema of.
+
+    Returns:
+    dict: Mapping of column names to dtypes.
+    """
+    if not isinstance(df, pl.LazyFrame):
+        return dict(df.schema)
+    schema = _SCHEMA_CACHE.get(df)
+    if schema is None:
+        schema = _SCHEMA_CACHE[df] = dict(df.schema)
+    return dict(schema)
+
+
+def validate_indicator_schema(
+    df: pl.LazyFrame,
+    include_volume: bool = False,
+    columns: list[str] | None = None,
+) -> None:
     """Validate that the schema of a dataframe matches the expected schema.
 
+    Float32 price and volume columns are accepted when the precision set in
+    `finta_polars.config` is "float32".
+
     Args:
     df (pl.LazyFrame): Dataframe to validate.
     include_volume (bool, optional): Whether to include volume in the schema.
         Defaults to False.
+    columns (list[str], optional): OHLCV columns to validate. Defaults to None.
+        If given, only these columns are validated and `include_volume` is ignored.
 
     Raises:
     PolarsSchemaError: If the schema of the dataframe does not match the
         expected schema.
     """
-    schema = dict(df.schema)
+    _validate_schema(
+        tuple(get_schema(df).items()),
+        include_volume,
+        None if columns is None else tuple(columns),
+        get_precision(),
+    )
+
+
+def indicator_schema_casts(
+    df: pl.LazyFrame,
+    include_volume: bool = False,
+    columns: list[str] | None = None,
+) -> list[pl.Expr]:
+    """Get the casts coercing the OHLCV columns of a dataframe to the expected schema.
+
+    Only the columns that do not already have an accepted dtype are cast, so the
+    list is empty for a dataframe that passes `validate_indicator_schema`. The casts
+    are meant to be added to the same query plan as the indicators, e.g. with
+    `df.with_columns(casts)`, rather than collected on their own.
+
+    Args:
+    df (pl.LazyFrame): Dataframe to coerce.
+    include_volume (bool, optional): Whether to include volume in the schema.
+        Defaults to False.
+    columns (list[str], optional): OHLCV columns to coerce. Defaults to None.
+        If given, only these columns are coerced and `include_volume` is ignored.
+
+    Returns:
+    list[pl.Expr]: Cast expressions named after the columns they cast.
+
+    Raises:
+    PolarsSchemaError: If a column is missing or is not numeric.
+    """
+    casts = _schema_casts(
+        tuple(get_schema(df).items()),
+        include_volume,
+        None if columns is None else tuple(columns),
+        get_precision(),
+    )
+    return [pl.col(c).cast(dtype) for c, dtype in casts]
+
+
+@lru_cache
+def _expected_schemas(
+    include_volume: bool, columns: tuple[str, ...] | None, precision: str
+) -> list[dict]:
+    """Get the acceptable schemas for the given columns and precision."""
+    volume_schemas = [INDICATOR_VOLUME_SCHEMA, INDICATOR_VOLUME_SCHEMA_INT]
+    if precision == "float32":
+        volume_schemas += INDICATOR_VOLUME_SCHEMAS_FLOAT32
+    if columns is not None:
+        unknown = set(columns) - set(INDICATOR_VOLUME_SCHEMA)
+        if unknown:
+            raise PolarsSchemaError(f"Columns {sorted(unknown)} are not OHLCV columns.")
+        return [
+            {c: dtype for c, dtype in expected.items() if c in columns}
+            for expected in volume_schemas
+        ]
     if include_volume:
-        expected_schemas = [INDICATOR_VOLUME_SCHEMA, INDICATOR_VOLUME_SCHEMA_INT]
-    else:
-        expected_schemas = [INDICATOR_SCHEMA]
-    if not _check_schemas(schema, expected_schemas):
+        return volume_schemas
+    return [
+        {c: dtype for c, dtype in expected.items() if c != "volume"}
+        for expected in volume_schemas
+    ]
+
+
+@lru_cache
+def _validate_schema(
+    schema: tuple,
+    include_volume: bool,
+    columns: tuple[str, ...] | None,
+    precision: str,
+) -> None:
+    """Validate a schema, caching the schemas that passed."""
+    expected_schemas = _expected_schemas(include_volume, columns, precision)
+    if not _check_schemas(dict(schema), expected_schemas):
         raise PolarsSchemaError(
             f"""
             Schema of dataframe does not match expected schema.
             Expected one of: {expected_schemas},
-            Actual: {schema}
+            Actual: {dict(schema)}
             """
         )
 
 
+@lru_cache
+def _schema_casts(
+    schema: tuple,
+    include_volume: bool,
+    columns: tuple[str, ...] | None,
+    precision: str,
+) -> tuple[tuple[str, pl.PolarsDataType], ...]:
+    """Get the columns of a schema to cast and the dtypes to cast them to."""
+    expected_schemas = _expected_schemas(include_volume, columns, precision)
+    schema = dict(schema)
+    if _check_schemas(schema, expected_schemas):
+        return ()
+    casts = []
+    for c in expected_schemas[0]:
+        if c not in schema:
+            raise PolarsSchemaError(f"Column {c!r} is missing from the dataframe.")
+        if schema[c] not in pl.NUMERIC_DTYPES:
+            raise PolarsSchemaError(
+                f"Column {c!r} of dtype {schema[c]} cannot be cast to a float."
+            )
+        if all(expected[c] != schema[c] for expected in expected_schemas):
+            casts.append((c, PRECISIONS[precision]))
+    return tuple(casts)
+
+
 def _check_schemas(schema: dict, expected_schemas: list[dict]) -> bool:
     """Check that the schema of a dataframe matches the expected schema.
 
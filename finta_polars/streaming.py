@@ -0,0 +1,689 @@
+"""Stateful indicators that can be advanced one bar at a time.
+
+The updaters in this module mirror the lazy functions in `finta_polars.indicators`
+so a live feed can continue where a historical computation stopped. Each updater
+can be seeded from history and then advanced with `update` in constant time
+(logarithmic time for the moving median).
+
+`StreamingEngine` applies the same updates to many instruments at once, keeping
+the state of every instrument in NumPy arrays.
+"""
+import heapq
+import inspect
+from collections import Counter, deque
+from collections.abc import Iterable
+from math import sqrt
+
+import numpy as np
+import polars as pl
+
+from finta_polars.indicators import (
+    OHLC_COLUMNS,
+    IndicatorSpec,
+    _expand_indicator_specs,
+    _exponential_moving_average_exprs,
+    _macd_exprs,
+    _resolve_indicator_spec,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+
+
+def _ewm_alpha(period: int) -> float:
+    """Get the smoothing factor polars uses for an `ewm_mean` with a given span."""
+    return 2 / (period + 1)
+
+
+class _RollingWindow:
+    """Fixed size window of the last observations, tracking how many are null."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values: deque[float | None] = deque()
+        self.null_count = 0
+
+    def push(self, value: float | None) -> tuple[bool, float | None]:
+        """Add a value to the window.
+
+        Returns:
+            tuple[bool, float | None]: Whether a value left the window, and the
+                value that left it.
+        """
+        self.values.append(value)
+        if value is None:
+            self.null_count += 1
+        if len(self.values) <= self.period:
+            return False, None
+        removed = self.values.popleft()
+        if removed is None:
+            self.null_count -= 1
+        return True, removed
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether the window is full and contains no nulls."""
+        return len(self.values) == self.period and self.null_count == 0
+
+
+class EMAUpdater:
+    """Incremental equivalent of `exponential_moving_average` for one column.
+
+    This replicates the recursion of polars' adjusted `ewm_mean`, so values match
+    the batch function exactly when seeded from the same history.
+    """
+
+    def __init__(self, period: int = 20):
+        """Create an updater without any history.
+
+        Args:
+            period (int, optional): Period to use for the exponential moving average.
+                Defaults to 20.
+        """
+        self.period = period
+        self._decay = 1 - _ewm_alpha(period)
+        self._weight = 1.0
+        self.value: float | None = None
+
+    @classmethod
+    def from_history(cls, values: Iterable[float | None], period: int = 20):
+        """Create an updater by replaying the history of a column."""
+        updater = cls(period)
+        for value in values:
+            updater.update(value)
+        return updater
+
+    @classmethod
+    def from_output(cls, value: float, count: int, period: int = 20):
+        """Create an updater from the output of `exponential_moving_average`.
+
+        Args:
+            value (float): Last value of the exponential moving average.
+            count (int): Number of non null observations the value was computed on.
+            period (int, optional): Period to use for the exponential moving average.
+                Defaults to 20.
+        """
+        updater = cls(period)
+        updater.value = value
+        for _ in range(count - 1):
+            weight = updater._weight * updater._decay + 1.0
+            if weight == updater._weight:
+                break
+            updater._weight = weight
+        return updater
+
+    def update(self, value: float | None) -> float | None:
+        """Advance the exponential moving average by one observation."""
+        if self.value is None:
+            self.value = value
+        elif value is not None:
+            self._weight *= self._decay
+            if self.value != value:
+                self.value = (self._weight * self.value + value) / (self._weight + 1.0)
+            self._weight += 1.0
+        return self.value
+
+
+class SMAUpdater:
+    """Incremental equivalent of `simple_moving_average` for one column."""
+
+    def __init__(self, period: int = 20):
+        """Create an updater without any history.
+
+        Args:
+            period (int, optional): Period to use for the moving average.
+                Defaults to 20.
+        """
+        self.period = period
+        self._window = _RollingWindow(period)
+        self._sum = 0.0
+
+    @classmethod
+    def from_history(cls, values: Iterable[float | None], period: int = 20):
+        """Create an updater from the history of a column.
+
+        Only the last `period` values are needed.
+        """
+        updater = cls(period)
+        for value in values:
+            updater.update(value)
+        return updater
+
+    def update(self, value: float | None) -> float | None:
+        """Advance the moving average by one observation."""
+        removed_any, removed = self._window.push(value)
+        if value is not None:
+            self._sum += value
+        if removed_any and removed is not None:
+            self._sum -= removed
+        if not self._window.is_valid:
+            return None
+        return self._sum / self.period
+
+
+class MovingStdUpdater:
+    """Incremental equivalent of `moving_std` for one column.
+
+    The mean and sum of squared deviations of the window are updated with Welford's
+    algorithm, which avoids the cancellation of a running sum of squares.
+    """
+
+    def __init__(self, period: int = 20):
+        """Create an updater without any history.
+
+        Args:
+            period (int, optional): Period to use for the moving std.
+                Defaults to 20.
+        """
+        self.period = period
+        self._window = _RollingWindow(period)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @classmethod
+    def from_history(cls, values: Iterable[float | None], period: int = 20):
+        """Create an updater from the history of a column.
+
+        Only the last `period` values are needed.
+        """
+        updater = cls(period)
+        for value in values:
+            updater.update(value)
+        return updater
+
+    def update(self, value: float | None) -> float | None:
+        """Advance the moving std by one observation."""
+        removed_any, removed = self._window.push(value)
+        if removed_any and removed is not None:
+            self._count -= 1
+            if self._count == 0:
+                self._mean, self._m2 = 0.0, 0.0
+            else:
+                delta = removed - self._mean
+                self._mean -= delta / self._count
+                self._m2 -= delta * (removed - self._mean)
+        if value is not None:
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+        if not self._window.is_valid:
+            return None
+        return sqrt(max(self._m2, 0.0) / (self.period - 1))
+
+
+class MovingMedianUpdater:
+    """Incremental equivalent of `simple_moving_median` for one column.
+
+    The window is split between a max-heap of its lower half and a min-heap of its
+    upper half. Values leaving the window are deleted lazily, once they reach the
+    top of their heap, so each update takes logarithmic time.
+    """
+
+    def __init__(self, period: int = 20):
+        """Create an updater without any history.
+
+        Args:
+            period (int, optional): Period to use for the moving median.
+                Defaults to 20.
+        """
+        self.period = period
+        self._window = _RollingWindow(period)
+        self._low: list[float] = []  # negated values, so the top is the maximum
+        self._high: list[float] = []
+        self._low_size = 0
+        self._high_size = 0
+        self._deleted: Counter[float] = Counter()
+
+    @classmethod
+    def from_history(cls, values: Iterable[float | None], period: int = 20):
+        """Create an updater from the history of a column.
+
+        Only the last `period` values are needed.
+        """
+        updater = cls(period)
+        for value in values:
+            updater.update(value)
+        return updater
+
+    def _prune(self, heap: list[float], sign: int):
+        """Pop the values deleted from the window off the top of a heap."""
+        while heap and self._deleted[sign * heap[0]]:
+            self._deleted[sign * heapq.heappop(heap)] -= 1
+
+    def _rebalance(self):
+        """Keep the lower half as large as the upper half, or one value larger."""
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+
+    def _insert(self, value: float):
+        """Add a value of the window to its half."""
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._rebalance()
+
+    def _remove(self, value: float):
+        """Delete a value that left the window from its half."""
+        self._deleted[value] += 1
+        if value <= -self._low[0]:
+            self._low_size -= 1
+            self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            self._prune(self._high, 1)
+        self._rebalance()
+
+    def update(self, value: float | None) -> float | None:
+        """Advance the moving median by one observation."""
+        removed_any, removed = self._window.push(value)
+        if removed_any and removed is not None:
+            self._remove(removed)
+        if value is not None:
+            self._insert(value)
+        if not self._window.is_valid:
+            return None
+        if self.period % 2:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+
+class MACDUpdater:
+    """Incremental equivalent of `macd` for one column.
+
+    Values match the batch function exactly when seeded from the same history.
+    """
+
+    def __init__(
+        self,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+    ):
+        """Create an updater without any history.
+
+        Args:
+            fast_period (int, optional): Period to use for the fast moving average.
+                Defaults to 12.
+            slow_period (int, optional): Period to use for the slow moving average.
+                Defaults to 26.
+            signal_period (int, optional): Period to use for the signal line.
+                Defaults to 9.
+        """
+        self.fast = EMAUpdater(fast_period)
+        self.slow = EMAUpdater(slow_period)
+        self.signal = EMAUpdater(signal_period)
+
+    @classmethod
+    def from_history(
+        cls,
+        values: Iterable[float | None],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+    ):
+        """Create an updater by replaying the history of a column."""
+        updater = cls(fast_period, slow_period, signal_period)
+        for value in values:
+            updater.update(value)
+        return updater
+
+    def update(self, value: float | None) -> tuple[float | None, float | None]:
+        """Advance the macd by one observation.
+
+        Returns:
+            tuple[float | None, float | None]: The macd and its signal line.
+        """
+        fast = self.fast.update(value)
+        slow = self.slow.update(value)
+        macd = None if fast is None else slow - fast
+        return macd, self.signal.update(macd)
+
+
+def seed_ema_updaters(
+    ema_df: pl.DataFrame,
+    ohlc_df: pl.DataFrame,
+    period: int = 20,
+) -> dict[str, EMAUpdater]:
+    """Create an `EMAUpdater` per column from the output of a batch computation.
+
+    Args:
+        ema_df (pl.DataFrame): Output of `exponential_moving_average` for a single
+            instrument.
+        ohlc_df (pl.DataFrame): Dataframe the output was computed from.
+        period (int, optional): Period the output was computed with.
+            Defaults to 20.
+
+    Returns:
+        dict[str, EMAUpdater]: Updaters keyed by the column they were computed on.
+    """
+    suffix = f"_ema_{period}"
+    updaters = {}
+    for column in ema_df.columns:
+        if not column.endswith(suffix):
+            continue
+        source = column.removesuffix(suffix)
+        value = ema_df[column].drop_nulls()
+        if len(value) == 0:
+            updaters[source] = EMAUpdater(period)
+            continue
+        updaters[source] = EMAUpdater.from_output(
+            value[-1], ohlc_df[source].drop_nulls().len(), period
+        )
+    return updaters
+
+
+def _window_mean(window: np.ndarray) -> np.ndarray:
+    return window.mean(axis=1)
+
+
+def _window_median(window: np.ndarray) -> np.ndarray:
+    return np.median(window, axis=1)
+
+
+def _window_std(window: np.ndarray) -> np.ndarray:
+    return window.std(axis=1, ddof=1)
+
+
+_WINDOW_KERNELS = {
+    simple_moving_average: _window_mean,
+    simple_moving_median: _window_median,
+    moving_std: _window_std,
+}
+
+
+def _bind_params(builder, params: dict) -> dict:
+    """Get the parameters of an indicator spec including the defaults."""
+    bound = inspect.signature(builder).bind([], **params)
+    bound.apply_defaults()
+    return {k: v for k, v in bound.arguments.items() if k != "columns"}
+
+
+def _output_name(builder, column: str, params: dict, index: int = 0) -> str:
+    """Get the name of an output column the same way the batch functions name it."""
+    return builder([column], **params)[index].meta.output_name()
+
+
+class _EMAState:
+    """Vectorized `EMAUpdater` state for every instrument."""
+
+    def __init__(self, period: int, capacity: int):
+        self.decay = 1 - _ewm_alpha(period)
+        self.value = np.full(capacity, np.nan)
+        self.weight = np.ones(capacity)
+
+    def grow(self, capacity: int) -> None:
+        extra = capacity - len(self.value)
+        self.value = np.concatenate([self.value, np.full(extra, np.nan)])
+        self.weight = np.concatenate([self.weight, np.ones(extra)])
+
+    def seed(self, slots: np.ndarray, values: np.ndarray, counts: np.ndarray) -> None:
+        """Seed the state from the last values and non null observation counts."""
+        self.value[slots] = values
+        weight = np.ones(len(slots))
+        for step in range(1, int(counts.max(initial=0))):
+            new_weight = np.where(counts > step, weight * self.decay + 1.0, weight)
+            if np.array_equal(new_weight, weight):
+                break
+            weight = new_weight
+        self.weight[slots] = weight
+
+    def update(self, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Advance the slots by one observation, nan meaning a null observation."""
+        current = self.value[slots]
+        weight = self.weight[slots]
+        observed = ~np.isnan(values)
+        advance = observed & ~np.isnan(current)
+        decayed = weight * self.decay
+        averaged = (decayed * current + values) / (decayed + 1.0)
+        averaged = np.where(current != values, averaged, current)
+        current = np.where(advance, averaged, np.where(observed, values, current))
+        self.weight[slots] = np.where(advance, decayed + 1.0, weight)
+        self.value[slots] = current
+        return current
+
+
+class StreamingEngine:
+    """Indicator state for many instruments advanced by batches of bars.
+
+    The state of all instruments is held in NumPy arrays with one row per
+    instrument, so a whole batch of bars is applied with a few vectorized operations.
+    Indicators are described with the same specs as `compute_indicators`, and the
+    output columns are named the same way as the batch functions name them.
+
+    Supported indicators are `simple_moving_average`, `simple_moving_median`,
+    `moving_std`, `exponential_moving_average` and `macd`.
+    """
+
+    def __init__(
+        self,
+        indicators: list[IndicatorSpec],
+        identifier_column: str,
+        columns: list[str] = OHLC_COLUMNS,
+        capacity: int = 1024,
+    ):
+        """Create an engine without any history.
+
+        Args:
+            indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+                accepted by `compute_indicators`.
+            identifier_column (str): Column to use as an identifier of instrument.
+            columns (list[str], optional): Columns to calculate the indicators on.
+                Defaults to the OHLC columns.
+            capacity (int, optional): Number of instruments to allocate state for.
+                The state grows automatically when more instruments are seen.
+                Defaults to 1024.
+        """
+        self.identifier_column = identifier_column
+        self.columns = list(columns)
+        self._slots: dict = {}
+        self._capacity = capacity
+        self._windows = []
+        self._emas = []
+        self._macds = []
+        self._ema_states: dict[tuple[str, int], _EMAState] = {}
+        self._signal_states: dict[str, _EMAState] = {}
+        window_size = 1
+        for spec in _expand_indicator_specs(indicators):
+            builder, _, params = _resolve_indicator_spec(spec)
+            func = spec[0] if isinstance(spec, tuple) else spec
+            params = _bind_params(builder, params)
+            if func in _WINDOW_KERNELS:
+                period = params["period"]
+                if isinstance(period, str):
+                    raise ValueError(f"Duration period {period!r} cannot be streamed.")
+                window_size = max(window_size, period)
+                for c in self.columns:
+                    name = _output_name(builder, c, params)
+                    self._windows.append((c, period, _WINDOW_KERNELS[func], name))
+            elif func is exponential_moving_average:
+                for c in self.columns:
+                    name = _output_name(builder, c, params)
+                    self._emas.append((c, params["period"], name))
+                    self._ema_state(c, params["period"])
+            elif func is macd:
+                for c in [c for c in self.columns if c in OHLC_COLUMNS]:
+                    names = (
+                        _output_name(builder, c, params, 0),
+                        _output_name(builder, c, params, 1),
+                    )
+                    self._macds.append((c, params, names))
+                    self._ema_state(c, params["fast_period"])
+                    self._ema_state(c, params["slow_period"])
+                    self._signal_states[names[1]] = _EMAState(
+                        params["signal_period"], capacity
+                    )
+            else:
+                raise ValueError(f"{func.__name__} cannot be streamed.")
+        self._window_size = window_size
+        self._buffers = {c: np.full((capacity, window_size), np.nan) for c in columns}
+        self._heads = np.zeros(capacity, dtype=np.int64)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+
+    def _ema_state(self, column: str, period: int) -> _EMAState:
+        key = (column, period)
+        if key not in self._ema_states:
+            self._ema_states[key] = _EMAState(period, self._capacity)
+        return self._ema_states[key]
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - self._capacity
+        for c, buffer in self._buffers.items():
+            padding = np.full((extra, self._window_size), np.nan)
+            self._buffers[c] = np.concatenate([buffer, padding])
+        self._heads = np.concatenate([self._heads, np.zeros(extra, dtype=np.int64)])
+        self._counts = np.concatenate([self._counts, np.zeros(extra, dtype=np.int64)])
+        for state in [*self._ema_states.values(), *self._signal_states.values()]:
+            state.grow(capacity)
+        self._capacity = capacity
+
+    def _get_slots(self, identifiers: list) -> np.ndarray:
+        """Get the state row of each identifier, allocating rows for new ones."""
+        for identifier in identifiers:
+            if identifier not in self._slots:
+                self._slots[identifier] = len(self._slots)
+        if len(self._slots) > self._capacity:
+            self._grow(max(len(self._slots), 2 * self._capacity))
+        return np.fromiter(
+            (self._slots[i] for i in identifiers),
+            dtype=np.int64,
+            count=len(identifiers),
+        )
+
+    @classmethod
+    def from_history(
+        cls,
+        ohlc_df: pl.DataFrame | pl.LazyFrame,
+        indicators: list[IndicatorSpec],
+        identifier_column: str,
+        columns: list[str] = OHLC_COLUMNS,
+    ):
+        """Create an engine seeded from the history of every instrument.
+
+        The exponential moving averages are seeded from a batch computation of the
+        history, so streamed values line up with the batch functions.
+
+        Args:
+            ohlc_df (pl.DataFrame | pl.LazyFrame): History sorted in time within each
+                instrument.
+            indicators (list[IndicatorSpec]): Indicators to calculate, in the format
+                accepted by `compute_indicators`.
+            identifier_column (str): Column to use as an identifier of instrument.
+            columns (list[str], optional): Columns to calculate the indicators on.
+                Defaults to the OHLC columns.
+        """
+        engine = cls(indicators, identifier_column, columns)
+        window = engine._window_size
+        aggs = [pl.count().alias("__count")]
+        aggs += [pl.col(c).tail(window).alias(f"__tail_{c}") for c in engine.columns]
+        for c, period in engine._ema_states:
+            (ema,) = _exponential_moving_average_exprs([c], period)
+            aggs.append(ema.last().alias(f"__ema_{c}_{period}"))
+            aggs.append(pl.col(c).drop_nulls().count().alias(f"__count_{c}_{period}"))
+        for c, params, names in engine._macds:
+            macd_expr, signal_expr = _macd_exprs([c], **params)
+            aggs.append(signal_expr.last().alias(f"__ema_{names[1]}"))
+            aggs.append(macd_expr.drop_nulls().count().alias(f"__count_{names[1]}"))
+        history = (
+            ohlc_df.lazy()
+            .groupby(identifier_column, maintain_order=True)
+            .agg(aggs)
+            .collect()
+        )
+        slots = engine._get_slots(history[identifier_column].to_list())
+        counts = history["__count"].to_numpy().astype(np.int64)
+        engine._counts[slots] = counts
+        engine._heads[slots] = counts % window
+        for c in engine.columns:
+            for slot, count, tail in zip(slots, counts, history[f"__tail_{c}"]):
+                values = tail.fill_null(np.nan).to_numpy()
+                positions = np.arange(count - len(values), count) % window
+                engine._buffers[c][slot, positions] = values
+        states = {f"{c}_{period}": s for (c, period), s in engine._ema_states.items()}
+        states.update(engine._signal_states)
+        for key, state in states.items():
+            values = history[f"__ema_{key}"].fill_null(np.nan).to_numpy()
+            key_counts = history[f"__count_{key}"].to_numpy().astype(np.int64)
+            state.seed(slots, values, key_counts)
+        return engine
+
+    def update(self, bars: pl.DataFrame) -> pl.DataFrame:
+        """Advance the indicators with a batch of new bars.
+
+        Bars of the same instrument are applied in the order they appear in.
+
+        Args:
+            bars (pl.DataFrame): New bars containing the identifier column and the
+                columns the indicators are calculated on.
+
+        Returns:
+            pl.DataFrame: The identifier column and the new indicator values for each
+                bar, in the order of the given bars.
+        """
+        identifier = pl.col(self.identifier_column)
+        rounds = bars.select(identifier.cumcount().over(identifier)).to_series()
+        rounds = rounds.to_numpy().astype(np.int64)
+        slots = self._get_slots(bars[self.identifier_column].to_list())
+        values = {
+            c: bars[c].cast(pl.Float64).fill_null(np.nan).to_numpy()
+            for c in self.columns
+        }
+        outputs = {}
+        for step in range(int(rounds.max(initial=-1)) + 1):
+            rows = np.flatnonzero(rounds == step)
+            for name, out in self._update(slots[rows], rows, values).items():
+                outputs.setdefault(name, np.full(len(bars), np.nan))[rows] = out
+        return pl.DataFrame(
+            [bars[self.identifier_column]]
+            + [
+                pl.Series(name, out, dtype=pl.Float64, nan_to_null=True)
+                for name, out in outputs.items()
+            ]
+        )
+
+    def _update(
+        self, slots: np.ndarray, rows: np.ndarray, values: dict[str, np.ndarray]
+    ) -> dict[str, np.ndarray]:
+        """Advance slots that each receive exactly one bar."""
+        heads = self._heads[slots]
+        for c in self.columns:
+            self._buffers[c][slots, heads] = values[c][rows]
+        self._heads[slots] = (heads + 1) % self._window_size
+        self._counts[slots] += 1
+        counts = self._counts[slots]
+
+        outputs = {}
+        for c, period, kernel, name in self._windows:
+            offsets = np.arange(-period, 0)
+            positions = (heads[:, None] + 1 + offsets) % self._window_size
+            out = kernel(self._buffers[c][slots[:, None], positions])
+            outputs[name] = np.where(counts >= period, out, np.nan)
+        ema_values = {
+            key: state.update(slots, values[key[0]][rows])
+            for key, state in self._ema_states.items()
+        }
+        for c, period, name in self._emas:
+            outputs[name] = ema_values[(c, period)]
+        for c, params, names in self._macds:
+            macd_values = (
+                ema_values[(c, params["slow_period"])]
+                - ema_values[(c, params["fast_period"])]
+            )
+            outputs[names[0]] = macd_values
+            signal = self._signal_states[names[1]]
+            outputs[names[1]] = signal.update(slots, macd_values)
+        return outputs
@@ -0,0 +1,141 @@
+"""Parameter sweeps of indicators for optimization grids.
+
+A sweep calculates an indicator for many parameter combinations and returns the
+results in long format, with one row per input row and combination. Intermediate
+results shared between combinations, such as the exponential moving average of each
+distinct span, are calculated once.
+"""
+from collections.abc import Iterable
+
+import polars as pl
+
+from finta_polars.expressions import _over, ema_expr
+from finta_polars.indicators import make_lazy
+
+ROW_COLUMN = "row"
+PERIOD_DTYPE = pl.UInt16
+ROW_DTYPE = pl.UInt32
+
+
+def _with_row_key(
+    ohlc_df: pl.LazyFrame, identifier_column: str | None
+) -> tuple[pl.LazyFrame, list[str]]:
+    """Add the position of each row within its instrument to a dataframe."""
+    row = _over(pl.arange(0, pl.count(), dtype=ROW_DTYPE), identifier_column)
+    keys = [] if identifier_column is None else [identifier_column]
+    return ohlc_df.with_columns(row.alias(ROW_COLUMN)), [*keys, ROW_COLUMN]
+
+
+def _ema_column(column: str, period: int) -> str:
+    return f"__{column}_ema_{period}"
+
+
+@make_lazy
+def sweep_ema(
+    ohlc_df: pl.LazyFrame,
+    periods: Iterable[int],
+    column: str = "close",
+    identifier_column: str | None = None,
+) -> pl.LazyFrame:
+    """Calculates the exponential moving average for many periods.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
+    Args:
+        ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
+        periods (Iterable[int]): Periods to calculate the exponential moving average
+            for.
+        column (str, optional): Column to calculate the exponential moving average of.
+            Defaults to "close".
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        pl.LazyFrame: Long dataframe with the identifier column, the `row` of each
+            value within its instrument, the `period` and the `ema`.
+    """
+    periods = sorted(set(periods))
+    ohlc_df, keys = _with_row_key(ohlc_df, identifier_column)
+    wide = ohlc_df.select(
+        *keys,
+        *[
+            ema_expr(column, p, identifier_column).alias(_ema_column(column, p))
+            for p in periods
+        ],
+    ).cache()
+    return pl.concat(
+        [
+            wide.select(
+                *keys,
+                pl.lit(p).cast(PERIOD_DTYPE).alias("period"),
+                pl.col(_ema_column(column, p)).alias("ema"),
+            )
+            for p in periods
+        ]
+    )
+
+
+@make_lazy
+def sweep_macd(
+    ohlc_df: pl.LazyFrame,
+    grid: Iterable[tuple[int, int, int]],
+    column: str = "close",
+    identifier_column: str | None = None,
+) -> pl.LazyFrame:
+    """Calculates the moving average convergence divergence for many parameters.
+
+    The exponential moving average of each distinct fast and slow period is calculated
+    once and shared by all combinations using it.
+
+    This requires the DataFrame to already be sorted upon calling this function.
+
+    Args:
+        ohlc_df (pl.LazyFrame): Dataframe containing the OHLC data.
+        grid (Iterable[tuple[int, int, int]]): Combinations of fast period, slow period
+            and signal period to calculate, e.g. from `itertools.product`.
+        column (str, optional): Column to calculate the macd of. Defaults to "close".
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+
+    Returns:
+        pl.LazyFrame: Long dataframe with the identifier column, the `row` of each
+            value within its instrument, the `fast_period`, `slow_period` and
+            `signal_period`, the `macd` and its `signal` line.
+    """
+    grid = list(dict.fromkeys(grid))
+    spans = sorted({p for fast, slow, _ in grid for p in (fast, slow)})
+    ohlc_df, keys = _with_row_key(ohlc_df, identifier_column)
+    wide = ohlc_df.select(
+        *keys,
+        *[
+            ema_expr(column, p, identifier_column).alias(_ema_column(column, p))
+            for p in spans
+        ],
+    )
+
+    def macd(fast: int, slow: int) -> pl.Expr:
+        return pl.col(_ema_column(column, slow)) - pl.col(_ema_column(column, fast))
+
+    wide = wide.with_columns(
+        [
+            _over(macd(fast, slow).ewm_mean(span=signal), identifier_column).alias(
+                f"__signal_{fast}_{slow}_{signal}"
+            )
+            for fast, slow, signal in grid
+        ]
+    ).cache()
+    return pl.concat(
+        [
+            wide.select(
+                *keys,
+                pl.lit(fast).cast(PERIOD_DTYPE).alias("fast_period"),
+                pl.lit(slow).cast(PERIOD_DTYPE).alias("slow_period"),
+                pl.lit(signal).cast(PERIOD_DTYPE).alias("signal_period"),
+                macd(fast, slow).alias("macd"),
+                pl.col(f"__signal_{fast}_{slow}_{signal}").alias("signal"),
+            )
+            for fast, slow, signal in grid
+        ]
+    )
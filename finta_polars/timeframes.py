@@ -0,0 +1,98 @@
+"""Indicators of higher timeframes aligned onto base bars.
+
+Each higher timeframe is aggregated from the base bars with `resample_bars`, its
+indicators are calculated once on the aggregated bars, and they are joined back to
+the base bars with `join_asof` on the close time of the aggregated bars. A base row
+only receives the indicators of aggregated bars which closed at or before its time,
+so the indicators never look ahead of the row. Every timeframe is part of the same
+lazy query plan as the base frame, so no intermediate frame is materialized.
+
+The joins are on a Utf8 identifier, as categoricals of separate branches of a plan
+cannot be compared. With categorical identifiers enabled in `finta_polars.config`,
+the identifier column is cast once after the last join.
+"""
+import polars as pl
+
+from finta_polars.config import get_categorical_identifier
+from finta_polars.indicators import (
+    IndicatorSpec,
+    _encode_identifier,
+    _get_ohlcv_columns,
+    compute_indicators,
+)
+from finta_polars.resample import resample_bars
+from finta_polars.schemas import get_schema
+
+_CLOSE_TIME = "__close_time"
+
+
+def compute_indicators_timeframes(
+    ohlc_df: pl.DataFrame | pl.LazyFrame,
+    timeframes: list[str],
+    indicators: list[IndicatorSpec],
+    identifier_column: str | None = None,
+    time_column: str = "time",
+    columns: list[str] | None = None,
+) -> pl.LazyFrame:
+    """Calculates indicators of higher timeframes and aligns them onto base bars.
+
+    Rows of each instrument must be sorted by time. The time of a base row is taken
+    as the time its data is known, so the aggregated bar of a day is only seen from
+    the first base row at or after the end of the day.
+
+    Args:
+        ohlc_df (pl.DataFrame | pl.LazyFrame): Dataframe containing the OHLC data of
+            the base bars. Volume can optionally be included.
+        timeframes (list[str]): Durations of the higher timeframes, e.g.
+            `["1d", "1w"]`.
+        indicators (list[IndicatorSpec]): Indicators to calculate on every timeframe,
+            in the format accepted by `compute_indicators`.
+        identifier_column (str, optional): Column to use as an identifier of instrument
+            in the dataframe. Defaults to None. If None, the dataframe is assumed to
+            contain data for only one instrument.
+        time_column (str, optional): Column of the time of each bar.
+            Defaults to "time".
+        columns (list[str], optional): OHLCV columns to restrict the computation to.
+            Defaults to None. If None, all OHLC columns are used, and volume if the
+            dataframe contains it.
+
+    Returns:
+        pl.LazyFrame: The base dataframe with the indicator columns of each
+            timeframe added, named with the timeframe as suffix, e.g.
+            `close_ema_20_1d`. Indicators are null on rows before the first
+            aggregated bar of their instrument closed.
+    """
+    ohlc_df = ohlc_df.lazy()
+    columns = _get_ohlcv_columns(ohlc_df, columns)
+    keys = [time_column]
+    if identifier_column is not None:
+        keys.insert(0, identifier_column)
+    out = ohlc_df
+    for timeframe in timeframes:
+        bars = resample_bars(
+            ohlc_df, timeframe, identifier_column, time_column, columns
+        )
+        bar_indicators = compute_indicators(
+            bars,
+            indicators,
+            identifier_column=identifier_column,
+            columns=columns,
+            categorical_identifier=False,
+        )
+        names = [c for c in get_schema(bar_indicators) if c not in keys]
+        bar_indicators = bar_indicators.select(
+            *keys[:-1],
+            pl.col(time_column).dt.offset_by(timeframe).alias(_CLOSE_TIME),
+            *[pl.col(name).alias(f"{name}_{timeframe}") for name in names],
+        )
+        out = out.join_asof(
+            bar_indicators,
+            left_on=time_column,
+            right_on=_CLOSE_TIME,
+            by=identifier_column,
+        )
+        if _CLOSE_TIME in get_schema(out):
+            out = out.drop(_CLOSE_TIME)
+    if get_categorical_identifier():
+        out = _encode_identifier(out, identifier_column)
+    return out
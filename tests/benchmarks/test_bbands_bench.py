@@ -0,0 +1,87 @@
+import numpy as np
+import polars as pl
+import pytest
+from finta import TA
+
+from finta_polars.indicators import (
+    OHLC_COLUMNS,
+    bbands,
+    moving_std,
+    simple_moving_average,
+)
+
+N_TICKERS = 1_000
+ROWS_PER_TICKER = 2_000
+
+
+@pytest.fixture(scope="module")
+def ohlc_df_many_companies():
+    """Random walks of many tickers, 2M rows."""
+    rng = np.random.default_rng(0)
+    close = rng.lognormal(0, 0.01, size=N_TICKERS * ROWS_PER_TICKER).cumprod()
+    return pl.DataFrame(
+        {
+            "ticker": np.repeat(np.arange(N_TICKERS), ROWS_PER_TICKER),
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+        }
+    )
+
+
+@pytest.mark.benchmark(group="bbands_many_companies")
+def test_bbands_all_prices_many_companies_polars(ohlc_df_many_companies, benchmark):
+    """Benchmark the bollinger bands derived from shared rolling means."""
+    out = bbands(ohlc_df_many_companies, period=20, identifier_column="ticker")
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="bbands_many_companies")
+def test_bbands_all_prices_many_companies_separate_polars(
+    ohlc_df_many_companies, benchmark
+):
+    """Benchmark the bollinger bands from separate sma and moving std frames."""
+    kwargs = {"period": 20, "identifier_column": "ticker", "columns": OHLC_COLUMNS}
+    sma = simple_moving_average(ohlc_df_many_companies, **kwargs)
+    msd = moving_std(ohlc_df_many_companies, **kwargs)
+
+    @benchmark
+    def result():
+        middle, deviation = pl.collect_all([sma, msd])
+        return middle.with_columns(
+            [
+                (middle[f"{c}_sma_20"] + 2 * deviation[f"{c}_msd_20"]).alias(
+                    f"{c}_bbands_20_upper"
+                )
+                for c in OHLC_COLUMNS
+            ]
+            + [
+                (middle[f"{c}_sma_20"] - 2 * deviation[f"{c}_msd_20"]).alias(
+                    f"{c}_bbands_20_lower"
+                )
+                for c in OHLC_COLUMNS
+            ]
+        )
+
+
+@pytest.mark.benchmark(group="bbands_multiple_companies")
+def test_bbands_close_multiple_companies_polars(ohlcv_df_multiple_companies, benchmark):
+    """Benchmark the bollinger bands of the close price per ticker."""
+    out = bbands(
+        ohlcv_df_multiple_companies,
+        period=20,
+        identifier_column="ticker",
+        columns=["close"],
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="bbands_multiple_companies")
+def test_bbands_close_multiple_companies_finta(ohlcv_df_multiple_companies, benchmark):
+    """Benchmark the bollinger bands of finta per ticker."""
+    ohlc_df = ohlcv_df_multiple_companies.to_pandas()
+
+    @benchmark
+    def result():
+        ohlc_df.groupby("ticker").apply(lambda df: TA.BBANDS(df, 20))
@@ -0,0 +1,42 @@
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+)
+
+
+@pytest.mark.benchmark(group="compute_indicators_multiple_companies")
+def test_compute_indicators_fused_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark
+):
+    """Benchmark calculating several indicators in one pass."""
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [simple_moving_average, moving_std, exponential_moving_average, macd],
+        identifier_column="ticker",
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="compute_indicators_multiple_companies")
+def test_compute_indicators_separate_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark
+):
+    """Benchmark calculating several indicators separately and joining them."""
+    df = ohlcv_df_multiple_companies.with_row_count()
+    frames = [
+        func(df, identifier_column="ticker")
+        for func in [simple_moving_average, moving_std, exponential_moving_average]
+    ]
+    frames.append(macd(df, identifier_column="ticker").drop("volume"))
+
+    @benchmark
+    def result():
+        out = frames[0]
+        for frame in frames[1:]:
+            out = out.join(frame.drop("ticker"), on="row_nr")
+        return out.collect()
@@ -0,0 +1,45 @@
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    moving_std,
+    simple_moving_average,
+)
+
+PERIODS = [5, 10, 20, 50, 100, 200]
+
+
+@pytest.mark.benchmark(group="multi_period_multiple_companies")
+def test_multi_period_one_call_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark
+):
+    """Benchmark calculating several periods in one pass."""
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [
+            (simple_moving_average, {"period": PERIODS}),
+            (moving_std, {"period": PERIODS}),
+        ],
+        identifier_column="ticker",
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="multi_period_multiple_companies")
+def test_multi_period_call_per_period_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark
+):
+    """Benchmark calculating one period per call and joining the results."""
+    df = ohlcv_df_multiple_companies.with_row_count()
+    frames = [
+        func(df, period=period, identifier_column="ticker").drop("ticker")
+        for func in [simple_moving_average, moving_std]
+        for period in PERIODS
+    ]
+
+    @benchmark
+    def result():
+        out = frames[0]
+        for frame in frames[1:]:
+            out = out.join(frame, on="row_nr")
+        return out.collect()
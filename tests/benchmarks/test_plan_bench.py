@@ -0,0 +1,47 @@
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+)
+from finta_polars.plan import IndicatorPlan
+
+INDICATORS = [simple_moving_average, moving_std, exponential_moving_average, macd]
+N_FRAMES = 1000
+ROWS_PER_FRAME = 300
+
+
+@pytest.fixture
+def many_small_frames(ohlcv_df):
+    """Small single instrument frames, as received one request at a time."""
+    return [
+        ohlcv_df.slice(i % 10 * ROWS_PER_FRAME, ROWS_PER_FRAME).with_columns(
+            pl.col("close") + i
+        )
+        for i in range(N_FRAMES)
+    ]
+
+
+@pytest.mark.benchmark(group="many_small_frames")
+def test_compute_indicators_many_small_frames_polars(many_small_frames, benchmark):
+    """Benchmark calling compute_indicators on every frame."""
+
+    @benchmark
+    def result():
+        return [
+            compute_indicators(df, INDICATORS).collect() for df in many_small_frames
+        ]
+
+
+@pytest.mark.benchmark(group="many_small_frames")
+def test_indicator_plan_many_small_frames_polars(many_small_frames, benchmark):
+    """Benchmark compiling a plan once and running it on every frame."""
+
+    @benchmark
+    def result():
+        plan = IndicatorPlan(INDICATORS, many_small_frames[0])
+        return [plan(df) for df in many_small_frames]
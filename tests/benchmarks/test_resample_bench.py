@@ -0,0 +1,49 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from finta_polars.indicators import compute_indicators, macd, simple_moving_average
+from finta_polars.resample import resample_ticks
+
+# 10M rather than 100M ticks, which do not fit in the memory of a laptop alongside
+# the bars of the two-step approach.
+N_TICKS = 10_000_000
+N_TICKERS = 500
+INDICATORS = [simple_moving_average, macd]
+
+
+@pytest.fixture(scope="module")
+def ticks_df():
+    """Trades of many tickers at random intervals of a few seconds."""
+    rng = np.random.default_rng(0)
+    ticks_per_ticker = N_TICKS // N_TICKERS
+    seconds = rng.exponential(3.0, size=(N_TICKERS, ticks_per_ticker)).cumsum(axis=1)
+    price = rng.lognormal(0, 0.0005, size=N_TICKS).cumprod()
+    return pl.DataFrame(
+        {
+            "ticker": np.repeat(np.arange(N_TICKERS), ticks_per_ticker),
+            "time": (seconds.ravel() * 1_000_000).astype("datetime64[us]"),
+            "price": price,
+            "size": rng.integers(1, 1000, size=N_TICKS),
+        }
+    )
+
+
+@pytest.mark.benchmark(group="resample_ticks")
+def test_resample_then_indicators_polars(ticks_df, benchmark):
+    """Benchmark collecting the bars before calculating the indicators."""
+
+    @benchmark
+    def result():
+        bars = resample_ticks(ticks_df, "1m", identifier_column="ticker").collect()
+        return compute_indicators(
+            bars, INDICATORS, identifier_column="ticker"
+        ).collect()
+
+
+@pytest.mark.benchmark(group="resample_ticks")
+def test_resample_fused_with_indicators_polars(ticks_df, benchmark):
+    """Benchmark resampling and calculating the indicators in one query."""
+    bars = resample_ticks(ticks_df, "1m", identifier_column="ticker")
+    out = compute_indicators(bars, INDICATORS, identifier_column="ticker")
+    benchmark(out.collect)
@@ -0,0 +1,72 @@
+import numpy as np
+import polars as pl
+import pytest
+from finta import TA
+
+from finta_polars.indicators import rsi
+
+N_ROWS = 1_000_000
+N_TICKERS = 100
+
+
+@pytest.fixture(scope="module")
+def ohlc_df_1m():
+    """A random walk of close prices, 1M rows."""
+    rng = np.random.default_rng(0)
+    close = rng.lognormal(0, 0.01, size=N_ROWS).cumprod()
+    return pl.DataFrame(
+        {
+            "ticker": np.repeat(np.arange(N_TICKERS), N_ROWS // N_TICKERS),
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+        }
+    )
+
+
+@pytest.mark.benchmark(group="rsi")
+def test_rsi_close_polars(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of the close price."""
+    out = rsi(ohlc_df_1m, period=14, columns=["close"])
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="rsi")
+def test_rsi_close_finta(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of finta."""
+    ohlc_df = ohlc_df_1m.to_pandas()
+    benchmark(TA.RSI, ohlc_df, 14)
+
+
+@pytest.mark.benchmark(group="rsi")
+def test_rsi_close_pandas_ta(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of pandas-ta."""
+    ta = pytest.importorskip("pandas_ta")
+    close = ohlc_df_1m["close"].to_pandas()
+    benchmark(ta.rsi, close, length=14)
+
+
+@pytest.mark.benchmark(group="rsi")
+def test_rsi_close_talib(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of TA-Lib."""
+    talib = pytest.importorskip("talib")
+    close = ohlc_df_1m["close"].to_numpy()
+    benchmark(talib.RSI, close, timeperiod=14)
+
+
+@pytest.mark.benchmark(group="rsi_multiple_companies")
+def test_rsi_close_multiple_companies_polars(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of the close price per ticker."""
+    out = rsi(ohlc_df_1m, period=14, identifier_column="ticker", columns=["close"])
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="rsi_multiple_companies")
+def test_rsi_close_multiple_companies_finta(ohlc_df_1m, benchmark):
+    """Benchmark the relative strength index of finta per ticker."""
+    ohlc_df = ohlc_df_1m.to_pandas()
+
+    @benchmark
+    def result():
+        ohlc_df.groupby("ticker").apply(lambda df: TA.RSI(df, 14))
@@ -0,0 +1,50 @@
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+)
+
+INDICATORS = [simple_moving_average, moving_std, exponential_moving_average, macd]
+ROWS_PER_TICKER = 300
+
+
+@pytest.fixture(params=[1_000, 10_000], ids=["1k_tickers", "10k_tickers"])
+def ohlcv_df_many_companies(request, ohlcv_df_multiple_companies):
+    """The multiple companies fixture scaled to many contiguous tickers."""
+    company = (
+        ohlcv_df_multiple_companies.filter(pl.col("ticker") == "AAPL")
+        .drop("ticker")
+        .head(ROWS_PER_TICKER)
+    )
+    return pl.concat([company] * request.param).with_columns(
+        (pl.arange(0, pl.count()) // ROWS_PER_TICKER)
+        .cast(pl.Utf8)
+        .str.rjust(5, "0")
+        .alias("ticker")
+    )
+
+
+@pytest.mark.benchmark(group="sorted_identifier_many_companies")
+def test_hashed_identifier_many_companies_polars(ohlcv_df_many_companies, benchmark):
+    """Benchmark partitioning the instruments by hashing the identifier."""
+    out = compute_indicators(
+        ohlcv_df_many_companies, INDICATORS, identifier_column="ticker"
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="sorted_identifier_many_companies")
+def test_sorted_identifier_many_companies_polars(ohlcv_df_many_companies, benchmark):
+    """Benchmark partitioning the instruments as slices of contiguous rows."""
+    out = compute_indicators(
+        ohlcv_df_many_companies,
+        INDICATORS,
+        identifier_column="ticker",
+        sorted_by_identifier=True,
+    )
+    benchmark(out.collect)
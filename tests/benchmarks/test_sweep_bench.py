@@ -0,0 +1,47 @@
+import itertools
+
+import polars as pl
+import pytest
+
+from finta_polars.indicators import macd
+from finta_polars.sweep import sweep_macd
+
+GRIDS = {
+    1: [(12, 26, 9)],
+    8: list(itertools.product([6, 12], [20, 26], [5, 9])),
+    27: list(itertools.product([6, 9, 12], [20, 26, 30], [5, 7, 9])),
+    125: list(itertools.product(range(4, 14, 2), range(20, 35, 3), range(5, 10))),
+}
+
+
+@pytest.mark.benchmark(group="macd_sweep_multiple_companies")
+@pytest.mark.parametrize("combinations", GRIDS)
+def test_macd_sweep_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark, combinations
+):
+    """Benchmark a macd sweep by the number of parameter combinations."""
+    out = sweep_macd(
+        ohlcv_df_multiple_companies, GRIDS[combinations], identifier_column="ticker"
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="macd_sweep_multiple_companies")
+@pytest.mark.parametrize("combinations", GRIDS)
+def test_macd_loop_multiple_companies_polars(
+    ohlcv_df_multiple_companies, benchmark, combinations
+):
+    """Benchmark calling macd once per parameter combination."""
+    frames = [
+        macd(
+            ohlcv_df_multiple_companies.select("ticker", "close").with_columns(
+                pl.lit(0.0).alias(c) for c in ["open", "high", "low"]
+            ),
+            fast_period=fast,
+            slow_period=slow,
+            signal_period=signal,
+            identifier_column="ticker",
+        )
+        for fast, slow, signal in GRIDS[combinations]
+    ]
+    benchmark(pl.collect_all, frames)
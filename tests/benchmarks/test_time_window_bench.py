@@ -0,0 +1,97 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+
+N_TICKERS = 1_000
+ROWS_PER_TICKER = 10_000
+
+
+@pytest.fixture(scope="module")
+def irregular_ohlc_df():
+    """Minute bars of many tickers with gaps of up to an hour, 10M rows."""
+    rng = np.random.default_rng(0)
+    gaps = rng.choice([1, 1, 1, 2, 5, 60], size=(N_TICKERS, ROWS_PER_TICKER))
+    minutes = gaps.cumsum(axis=1).ravel()
+    close = rng.lognormal(0, 0.001, size=minutes.size).cumprod()
+    return pl.DataFrame(
+        {
+            "ticker": np.repeat(np.arange(N_TICKERS), ROWS_PER_TICKER),
+            "time": (minutes * 60_000_000).astype("datetime64[us]"),
+            "open": close,
+            "high": close * 1.001,
+            "low": close * 0.999,
+            "close": close,
+        }
+    )
+
+
+@pytest.mark.benchmark(group="time_window_sma")
+def test_row_window_sma_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving average over 30 rows."""
+    out = simple_moving_average(
+        irregular_ohlc_df, period=30, identifier_column="ticker", columns=["close"]
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="time_window_sma")
+def test_time_window_sma_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving average over 30 minutes."""
+    out = simple_moving_average(
+        irregular_ohlc_df,
+        period="30m",
+        identifier_column="ticker",
+        columns=["close"],
+        time_column="time",
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="time_window_msd")
+def test_row_window_msd_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving std over 30 rows."""
+    out = moving_std(
+        irregular_ohlc_df, period=30, identifier_column="ticker", columns=["close"]
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="time_window_msd")
+def test_time_window_msd_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving std over 30 minutes."""
+    out = moving_std(
+        irregular_ohlc_df,
+        period="30m",
+        identifier_column="ticker",
+        columns=["close"],
+        time_column="time",
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="time_window_smm")
+def test_row_window_smm_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving median over 30 rows."""
+    out = simple_moving_median(
+        irregular_ohlc_df, period=30, identifier_column="ticker", columns=["close"]
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="time_window_smm")
+def test_time_window_smm_polars(irregular_ohlc_df, benchmark):
+    """Benchmark a moving median over 30 minutes, computed with groupby_rolling."""
+    out = simple_moving_median(
+        irregular_ohlc_df,
+        period="30m",
+        identifier_column="ticker",
+        columns=["close"],
+        time_column="time",
+    )
+    benchmark(out.collect)
@@ -0,0 +1,72 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+)
+from finta_polars.resample import resample_bars
+from finta_polars.timeframes import compute_indicators_timeframes
+
+N_TICKERS = 200
+ROWS_PER_TICKER = 20_000
+TIMEFRAMES = ["1h", "1d", "1w"]
+INDICATORS = [exponential_moving_average, macd]
+
+
+@pytest.fixture(scope="module")
+def minute_bars_df():
+    """Minute bars of many tickers, 4M rows."""
+    rng = np.random.default_rng(0)
+    close = rng.lognormal(0, 0.001, size=N_TICKERS * ROWS_PER_TICKER).cumprod()
+    minutes = np.tile(np.arange(ROWS_PER_TICKER), N_TICKERS)
+    return pl.DataFrame(
+        {
+            "ticker": np.repeat(np.arange(N_TICKERS), ROWS_PER_TICKER),
+            "time": (minutes * 60_000_000).astype("datetime64[us]"),
+            "open": close,
+            "high": close * 1.001,
+            "low": close * 0.999,
+            "close": close,
+        }
+    )
+
+
+@pytest.mark.benchmark(group="timeframes")
+def test_timeframes_by_hand_polars(minute_bars_df, benchmark):
+    """Benchmark resampling, calculating and joining back each timeframe eagerly."""
+
+    @benchmark
+    def result():
+        out = minute_bars_df
+        for timeframe in TIMEFRAMES:
+            bars = resample_bars(
+                minute_bars_df, timeframe, identifier_column="ticker"
+            ).collect()
+            bar_indicators = compute_indicators(
+                bars, INDICATORS, identifier_column="ticker", columns=["close"]
+            ).collect()
+            bar_indicators = bar_indicators.with_columns(
+                pl.col("time").dt.offset_by(timeframe)
+            )
+            bar_indicators.columns = [
+                c if c in ("ticker", "time") else f"{c}_{timeframe}"
+                for c in bar_indicators.columns
+            ]
+            out = out.join_asof(bar_indicators, on="time", by="ticker")
+        return out
+
+
+@pytest.mark.benchmark(group="timeframes")
+def test_timeframes_single_plan_polars(minute_bars_df, benchmark):
+    """Benchmark every timeframe in a single lazy plan."""
+    out = compute_indicators_timeframes(
+        minute_bars_df,
+        TIMEFRAMES,
+        INDICATORS,
+        identifier_column="ticker",
+        columns=["close"],
+    )
+    benchmark(out.collect)
@@ -0,0 +1,54 @@
+import polars as pl
+import pytest
+from finta import TA
+
+from finta_polars.indicators import vwap
+
+
+@pytest.mark.benchmark(group="vwap")
+def test_vwap_polars(ohlcv_df, benchmark):
+    """Benchmark the cumulative volume weighted average price."""
+    out = vwap(ohlcv_df)
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="vwap")
+def test_vwap_rolling_polars(ohlcv_df, benchmark):
+    """Benchmark the rolling volume weighted average price."""
+    out = vwap(ohlcv_df, period=41)
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="vwap")
+def test_vwap_finta(ohlcv_df, benchmark):
+    """Benchmark the volume weighted average price of finta."""
+    ohlc_df = ohlcv_df.to_pandas()
+    benchmark(TA.VWAP, ohlc_df)
+
+
+@pytest.mark.benchmark(group="vwap_multiple_companies")
+def test_vwap_multiple_companies_polars(ohlcv_df_multiple_companies, benchmark):
+    """Benchmark the cumulative volume weighted average price per ticker."""
+    out = vwap(ohlcv_df_multiple_companies, identifier_column="ticker")
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="vwap_multiple_companies")
+def test_vwap_session_multiple_companies_polars(ohlcv_df_multiple_companies, benchmark):
+    """Benchmark the volume weighted average price restarting every session."""
+    out = vwap(
+        ohlcv_df_multiple_companies,
+        identifier_column="ticker",
+        session=(pl.col("open") // 390).alias("session"),
+    )
+    benchmark(out.collect)
+
+
+@pytest.mark.benchmark(group="vwap_multiple_companies")
+def test_vwap_multiple_companies_finta(ohlcv_df_multiple_companies, benchmark):
+    """Benchmark the volume weighted average price of finta per ticker."""
+    ohlc_df = ohlcv_df_multiple_companies.to_pandas()
+
+    @benchmark
+    def result():
+        ohlc_df.groupby("ticker").apply(lambda df: TA.VWAP(df))
@@ -31,3 +31,20 @@ def ohlcv_df_multiple_companies():
             + ["FB"] * 3000,
         }
     )
+
+
+@pytest.fixture
+def assert_same_output():
+    """Compare indicator outputs, allowing rounding in rolling sums."""
+
+    def assert_same(out, expected):
+        assert out.columns == expected.columns
+        assert out.dtypes == expected.dtypes
+        for c in out.columns:
+            if "_sma_" in c or "_msd_" in c:
+                assert out[c].null_count() == expected[c].null_count()
+                assert (out[c] - expected[c]).abs().max() < 1e-9
+            else:
+                assert out[c].series_equal(expected[c], null_equal=True)
+
+    return assert_same
@@ -0,0 +1,89 @@
+"""Tests for cache.py."""
+import polars as pl
+import pytest
+
+from finta_polars.cache import IndicatorCache, fingerprint
+from finta_polars.config import use_precision
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    simple_moving_average,
+)
+
+
+def test_cache_hits_and_misses(ohlcv_df_multiple_companies, tmp_path):
+    cache = IndicatorCache(tmp_path)
+    cached_macd = cache(macd)
+    out = cached_macd(ohlcv_df_multiple_companies, identifier_column="ticker")
+    expected = macd(ohlcv_df_multiple_companies, identifier_column="ticker")
+    assert out.collect().frame_equal(expected.collect(), null_equal=True)
+    assert cache.cache_info()[:2] == (0, 1)
+
+    # The same data in a new frame and the same parameters given positionally hit.
+    out = cached_macd(ohlcv_df_multiple_companies.lazy(), 12, 26, 9, "ticker")
+    assert out.collect().frame_equal(expected.collect(), null_equal=True)
+    assert cache.cache_info()[:2] == (1, 1)
+
+    cached_macd(ohlcv_df_multiple_companies, signal_period=5)
+    cached_macd(ohlcv_df_multiple_companies.with_columns(pl.col("open") + 1))
+    assert cache.cache_info()[:2] == (1, 3)
+    assert len(list(tmp_path.glob("*.arrow"))) == 3
+    # Results are reused by a new cache on the same directory.
+    cache = IndicatorCache(tmp_path)
+    cache(macd)(ohlcv_df_multiple_companies, identifier_column="ticker")
+    assert cache.cache_info()[:2] == (1, 0)
+
+
+def test_cache_indicator_specs(ohlcv_df, tmp_path):
+    cache = IndicatorCache(tmp_path)
+    indicators = [simple_moving_average, (exponential_moving_average, {"period": 5})]
+    cache(compute_indicators)(ohlcv_df, indicators)
+    out = cache(compute_indicators)(ohlcv_df, indicators)
+    assert cache.cache_info()[:2] == (1, 1)
+    assert out.collect().frame_equal(
+        compute_indicators(ohlcv_df, indicators).collect(), null_equal=True
+    )
+
+
+def test_cache_evicts_least_recently_used(ohlcv_df, tmp_path):
+    cache = IndicatorCache(tmp_path)
+    cached_sma = cache(simple_moving_average)
+    cached_sma(ohlcv_df, period=5)
+    cache.max_size = int(2.5 * cache.cache_info().size)
+    cached_sma(ohlcv_df, period=10)
+    cached_sma(ohlcv_df, period=5)
+    # Evicts period 10, the least recently used.
+    cached_sma(ohlcv_df, period=20)
+    assert cache.cache_info().size <= cache.max_size
+    cached_sma(ohlcv_df, period=5)
+    cached_sma(ohlcv_df, period=10)
+    assert cache.cache_info()[:2] == (2, 4)
+
+
+def test_cache_key_includes_config(ohlcv_df, tmp_path):
+    cached_sma = IndicatorCache(tmp_path)(simple_moving_average)
+    cached_sma(ohlcv_df)
+    with use_precision("float32"):
+        out = cached_sma(ohlcv_df).collect()
+        expected = simple_moving_average(ohlcv_df).collect()
+    assert out.schema == expected.schema
+    assert out["close_sma_20"].dtype == pl.Float32
+
+
+def test_cache_refuses_anonymous_functions(ohlcv_df, tmp_path):
+    cache = IndicatorCache(tmp_path)
+
+    def local_indicator(df):
+        return simple_moving_average(df)
+
+    with pytest.raises(ValueError, match="cannot be cached"):
+        cache(local_indicator)(ohlcv_df)
+    with pytest.raises(ValueError, match="cannot be cached"):
+        cache(compute_indicators)(ohlcv_df, [lambda columns: []])
+
+
+def test_fingerprint(ohlcv_df):
+    assert fingerprint(ohlcv_df) == fingerprint(ohlcv_df.clone())
+    assert fingerprint(ohlcv_df) != fingerprint(ohlcv_df.reverse())
+    assert fingerprint(ohlcv_df) != fingerprint(ohlcv_df.rename({"open": "o"}))
@@ -0,0 +1,91 @@
+"""Tests for config.py."""
+import numpy as np
+import polars as pl
+import pytest
+
+from finta_polars.config import get_precision, set_precision, use_precision
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    rsi,
+    simple_moving_average,
+    simple_moving_median,
+)
+
+INDICATORS = [
+    simple_moving_average,
+    simple_moving_median,
+    moving_std,
+    exponential_moving_average,
+    macd,
+]
+
+
+@pytest.fixture
+def random_walk_df():
+    """Geometric random walk with strictly positive prices."""
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(rng.normal(scale=0.01, size=100_000).cumsum())
+    return pl.DataFrame(
+        {
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.integers(0, 1000, size=len(close)),
+        }
+    )
+
+
+def test_use_precision():
+    """Validate that the precision is restored after the block."""
+    with use_precision("float32"):
+        assert get_precision() == "float32"
+    assert get_precision() == "float64"
+
+
+def test_set_precision_invalid():
+    """Validate that an unknown precision raises an error."""
+    with pytest.raises(ValueError):
+        set_precision("float16")
+
+
+def test_float32_outputs(random_walk_df):
+    """Validate that Float32 inputs give Float32 indicators."""
+    df = random_walk_df.with_columns(
+        pl.col(["open", "high", "low", "close"]).cast(pl.Float32)
+    )
+    out = compute_indicators(df, [*INDICATORS, rsi], precision="float32").collect()
+    assert set(out.dtypes) == {pl.Float32}
+    assert get_precision() == "float64"
+
+
+@pytest.mark.parametrize(
+    "indicator, bound",
+    [
+        ("sma", 1.2e-7),
+        ("smm", 1.2e-7),
+        ("msd", 1.2e-7),
+        ("ema", 1e-6),
+    ],
+)
+def test_float32_error_bounds(random_walk_df, indicator, bound):
+    """Validate the documented relative error bounds of Float32 indicators."""
+    expected = compute_indicators(random_walk_df, INDICATORS).collect()
+    out = compute_indicators(random_walk_df, INDICATORS, precision="float32").collect()
+    for column in expected.columns:
+        if f"_{indicator}_" in column:
+            error = (out[column] - expected[column]).abs() / expected[column].abs()
+            assert error.max() < bound
+
+
+def test_float32_macd_error_bound(random_walk_df):
+    """Validate that the Float32 macd error is bounded relative to the price."""
+    expected = macd(random_walk_df).collect()
+    with use_precision("float32"):
+        out = macd(random_walk_df).collect()
+    for column in expected.columns:
+        error = (out[column] - expected[column]).abs() / random_walk_df["close"]
+        assert error.max() < 1e-6
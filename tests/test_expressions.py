@@ -0,0 +1,63 @@
+"""Tests for expressions.py."""
+import polars as pl
+
+from finta_polars.expressions import (
+    ema_expr,
+    macd_exprs,
+    msd_expr,
+    sma_expr,
+    smm_expr,
+    typical_price_expr,
+)
+from finta_polars.indicators import exponential_moving_average, macd
+
+
+def test_expressions_are_named_like_indicators(ohlcv_df):
+    out = ohlcv_df.select(
+        sma_expr("close", 5),
+        smm_expr("close", 5),
+        msd_expr("close", 5),
+        ema_expr("close", 5),
+        *macd_exprs("close"),
+        typical_price_expr(),
+    )
+    assert out.columns == [
+        "close_sma_5",
+        "close_smm_5",
+        "close_msd_5",
+        "close_ema_5",
+        "close_macd_12_26",
+        "close_macd_12_26_signal",
+        "typical_price",
+    ]
+    assert out.select(pl.last("close_sma_5")).item() == 2997.0
+    assert out.select(pl.last("close_smm_5")).item() == 2997.0
+
+
+def test_expressions_embed_in_with_columns(ohlcv_df_multiple_companies):
+    out = ohlcv_df_multiple_companies.with_columns(
+        ema_expr("close", 10, identifier_column="ticker"),
+        *macd_exprs("close", identifier_column="ticker"),
+    )
+    assert out.columns[:6] == ohlcv_df_multiple_companies.columns
+    expected = exponential_moving_average(
+        ohlcv_df_multiple_companies, period=10, identifier_column="ticker"
+    ).collect()
+    assert out["close_ema_10"].series_equal(expected["close_ema_10"])
+    expected = macd(ohlcv_df_multiple_companies, identifier_column="ticker").collect()
+    assert out["close_macd_12_26_signal"].series_equal(
+        expected["close_macd_12_26_signal"]
+    )
+
+
+def test_expressions_accept_multiple_column_expressions(ohlcv_df_multiple_companies):
+    out = ohlcv_df_multiple_companies.select(
+        sma_expr(pl.col(["open", "close"]), 5, identifier_column="ticker"),
+        *macd_exprs(pl.col("close") * 2),
+    )
+    assert out.columns == [
+        "open_sma_5",
+        "close_sma_5",
+        "close_macd_12_26",
+        "close_macd_12_26_signal",
+    ]
@@ -0,0 +1,83 @@
+"""Tests for incremental.py."""
+import polars as pl
+import pytest
+
+from finta_polars.incremental import append_indicators, indicator_state
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+
+INDICATORS = [
+    (simple_moving_average, {"period": 5}),
+    (moving_std, {"period": 10}),
+    (simple_moving_median, {"period": 4}),
+    exponential_moving_average,
+    macd,
+]
+
+
+@pytest.fixture
+def noisy_df(ohlcv_df_multiple_companies):
+    return ohlcv_df_multiple_companies.with_columns(
+        pl.when(pl.col("close") % 97 == 0)
+        .then(None)
+        .otherwise(pl.col("close") * pl.col("close").sin().abs())
+        .alias("close"),
+        (pl.arange(0, pl.count()) % 3000).over("ticker").alias("row"),
+    )
+
+
+def test_append_indicators_matches_full_recompute(noisy_df, assert_same_output):
+    history = noisy_df.filter(pl.col("row") < 2900)
+    state = indicator_state(history, INDICATORS, identifier_column="ticker")
+    for start, end in [(2900, 2950), (2950, 3000)]:
+        new = noisy_df.filter((pl.col("row") >= start) & (pl.col("row") < end))
+        out, state = append_indicators(
+            state, new, INDICATORS, identifier_column="ticker"
+        )
+        expected = compute_indicators(
+            noisy_df.filter(pl.col("row") < end), INDICATORS, identifier_column="ticker"
+        ).collect()
+        assert_same_output(out, expected.filter(pl.col("row") >= start))
+
+
+def test_append_indicators_single_instrument_and_new_instrument(
+    noisy_df, assert_same_output
+):
+    single = noisy_df.filter(pl.col("ticker") == "AAPL").drop("ticker")
+    state = indicator_state(single[:2000], INDICATORS)
+    out, _ = append_indicators(state, single[2000:], INDICATORS)
+    expected = compute_indicators(single, INDICATORS).collect()[2000:]
+    assert_same_output(out, expected)
+
+    history = noisy_df.filter(pl.col("ticker") != "FB")
+    state = indicator_state(history, INDICATORS, identifier_column="ticker")
+    out, state = append_indicators(
+        state,
+        noisy_df.filter(pl.col("ticker") == "FB"),
+        INDICATORS,
+        identifier_column="ticker",
+    )
+    expected = compute_indicators(
+        noisy_df.filter(pl.col("ticker") == "FB"),
+        INDICATORS,
+        identifier_column="ticker",
+    ).collect()
+    assert_same_output(out, expected)
+    assert state["ticker"].to_list() == ["AAPL", "MSFT", "GOOG", "AMZN", "FB"]
+
+
+def test_append_indicators_short_history_with_nulls():
+    df = pl.DataFrame({"close": [1.0, 2.0, 3.0, None, 5.0, 6.0, None, 8.0]})
+    indicators = [(exponential_moving_average, {"period": 3}), macd]
+    state = indicator_state(df[:4], indicators, columns=["close"])
+    out, _ = append_indicators(state, df[4:], indicators, columns=["close"])
+    expected = compute_indicators(df, indicators, columns=["close"]).collect()[4:]
+    assert out.columns == expected.columns
+    for c in out.columns:
+        assert out[c].to_list() == pytest.approx(expected[c].to_list(), rel=1e-12)
@@ -1,14 +1,26 @@
 """Tests for indicator functions."""
+from datetime import datetime, timedelta
+
 import polars as pl
 import pytest
+from finta import TA
+from polars.testing import assert_frame_equal, assert_series_equal
 
+from finta_polars.expressions import ema_expr
 from finta_polars.indicators import (
+    bbands,
+    collect_indicators,
+    compute_indicators,
     typical_price,
     exponential_moving_average,
+    macd,
     moving_std,
+    rsi,
     simple_moving_average,
     simple_moving_median,
+    vwap,
 )
+from finta_polars.schemas import PolarsSchemaError
 
 
 def test_simple_moving_average_no_volume(ohlcv_df):
@@ -179,3 +191,425 @@ def test_typical_price_multiple_companies(ohlcv_df_multiple_companies):
         "ticker",
         "typical_price",
     ]
+
+
+def test_macd_multiple_companies(ohlcv_df_multiple_companies):
+    out = macd(ohlcv_df_multiple_companies, identifier_column="ticker").collect()
+    assert out.shape == (15000, 10)
+    assert out.columns == [
+        "volume",
+        "ticker",
+        "open_macd_12_26",
+        "open_macd_12_26_signal",
+        "high_macd_12_26",
+        "high_macd_12_26_signal",
+        "low_macd_12_26",
+        "low_macd_12_26_signal",
+        "close_macd_12_26",
+        "close_macd_12_26_signal",
+    ]
+    expected = (
+        ohlcv_df_multiple_companies.filter(pl.col("ticker") == "FB")
+        .select(
+            (pl.col("close").ewm_mean(span=26) - pl.col("close").ewm_mean(span=12))
+            .ewm_mean(span=9)
+            .alias("signal")
+        )
+        .to_series()
+    )
+    assert out.filter(pl.col("ticker") == "FB")["close_macd_12_26_signal"].series_equal(
+        expected.alias("close_macd_12_26_signal")
+    )
+
+
+def test_compute_indicators_multiple_companies(ohlcv_df_multiple_companies):
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [
+            simple_moving_average,
+            (moving_std, {"period": 5}),
+            (exponential_moving_average, {"period": 10}),
+            (macd, {"fast_period": 6, "slow_period": 13}),
+        ],
+        identifier_column="ticker",
+    ).collect()
+    assert out.shape == (15000, 24)
+    assert out.columns[:6] == [
+        "ticker",
+        "open_sma_20",
+        "high_sma_20",
+        "low_sma_20",
+        "close_sma_20",
+        "volume_sma_20",
+    ]
+    separate = [
+        simple_moving_average(ohlcv_df_multiple_companies, identifier_column="ticker"),
+        moving_std(ohlcv_df_multiple_companies, period=5, identifier_column="ticker"),
+        exponential_moving_average(
+            ohlcv_df_multiple_companies, period=10, identifier_column="ticker"
+        ),
+        macd(
+            ohlcv_df_multiple_companies,
+            fast_period=6,
+            slow_period=13,
+            identifier_column="ticker",
+        ).drop("volume"),
+    ]
+    expected = pl.concat(
+        [separate[0].collect()] + [s.drop("ticker").collect() for s in separate[1:]],
+        how="horizontal",
+    )
+    assert out.frame_equal(expected, null_equal=True)
+
+
+def test_compute_indicators_rejects_unknown_function(ohlcv_df):
+    with pytest.raises(ValueError):
+        compute_indicators(ohlcv_df, [typical_price])
+
+
+def test_simple_moving_average_multiple_periods(ohlcv_df_multiple_companies):
+    out = simple_moving_average(
+        ohlcv_df_multiple_companies, period=[5, 10], identifier_column="ticker"
+    ).collect()
+    assert out.columns == [
+        "ticker",
+        *[f"{c}_sma_5" for c in ["open", "high", "low", "close", "volume"]],
+        *[f"{c}_sma_10" for c in ["open", "high", "low", "close", "volume"]],
+    ]
+    for period in [5, 10]:
+        expected = simple_moving_average(
+            ohlcv_df_multiple_companies, period=period, identifier_column="ticker"
+        ).collect()
+        assert out.select(expected.columns).frame_equal(expected, null_equal=True)
+
+
+def test_compute_indicators_multiple_periods(ohlcv_df):
+    out = compute_indicators(
+        ohlcv_df,
+        [
+            (moving_std, {"period": [5, 20]}),
+            (exponential_moving_average, {"period": [3, 9]}),
+        ],
+    ).collect()
+    assert out.columns[4] == "volume_msd_5"
+    assert out.columns[-1] == "volume_ema_9"
+    assert out.width == 20
+
+
+def test_simple_moving_median_columns(ohlcv_df_multiple_companies):
+    out = simple_moving_median(
+        ohlcv_df_multiple_companies,
+        period=5,
+        identifier_column="ticker",
+        columns=["close"],
+    ).collect()
+    assert out.columns == ["open", "high", "low", "volume", "ticker", "close_smm_5"]
+    assert out.select(pl.last("close_smm_5")).item() == 2997.0
+
+
+def test_columns_only_requires_requested_columns(ohlcv_df):
+    out = exponential_moving_average(
+        ohlcv_df.select("close"), period=5, columns=["close"]
+    ).collect()
+    assert out.columns == ["close_ema_5"]
+    out = macd(ohlcv_df.select("close", "volume"), columns=["close"]).collect()
+    assert out.columns == ["volume", "close_macd_12_26", "close_macd_12_26_signal"]
+
+
+def test_columns_rejects_unknown_columns(ohlcv_df):
+    with pytest.raises(PolarsSchemaError):
+        moving_std(ohlcv_df, columns=["vwap"])
+    with pytest.raises(PolarsSchemaError):
+        moving_std(ohlcv_df.drop("close"), columns=["close"])
+
+
+def test_compute_indicators_columns(ohlcv_df_multiple_companies):
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [simple_moving_average, macd],
+        identifier_column="ticker",
+        columns=["close", "volume"],
+    ).collect()
+    assert out.columns == [
+        "open",
+        "high",
+        "low",
+        "ticker",
+        "close_sma_20",
+        "volume_sma_20",
+        "close_macd_12_26",
+        "close_macd_12_26_signal",
+    ]
+
+
+def test_compute_indicators_coerce(ohlcv_df_multiple_companies):
+    int_df = ohlcv_df_multiple_companies.with_columns(
+        pl.col(["open", "high", "low", "close"]).cast(pl.Int32),
+        pl.col("volume").cast(pl.UInt32),
+    )
+    with pytest.raises(PolarsSchemaError):
+        compute_indicators(int_df, [simple_moving_average, macd])
+    out = compute_indicators(
+        int_df, [simple_moving_average, macd], identifier_column="ticker", coerce=True
+    ).collect()
+    expected = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [simple_moving_average, macd],
+        identifier_column="ticker",
+    ).collect()
+    assert out.frame_equal(expected, null_equal=True)
+
+
+def test_compute_indicators_sorted_by_identifier(ohlcv_df_multiple_companies):
+    indicators = [simple_moving_average, simple_moving_median, moving_std, macd]
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        indicators,
+        identifier_column="ticker",
+        sorted_by_identifier=True,
+    ).collect()
+    expected = compute_indicators(
+        ohlcv_df_multiple_companies, indicators, identifier_column="ticker"
+    ).collect()
+    assert out.frame_equal(expected, null_equal=True)
+    assert not out["ticker"].flags["SORTED_ASC"]
+
+
+def test_compute_indicators_categorical_identifier(ohlcv_df_multiple_companies):
+    indicators = [simple_moving_average, macd]
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        indicators,
+        identifier_column="ticker",
+        categorical_identifier=True,
+    ).collect()
+    expected = compute_indicators(
+        ohlcv_df_multiple_companies, indicators, identifier_column="ticker"
+    ).collect()
+    assert out["ticker"].dtype == pl.Categorical
+    assert out.with_columns(pl.col("ticker").cast(pl.Utf8)).frame_equal(
+        expected, null_equal=True
+    )
+
+
+def test_collect_indicators(ohlcv_df_multiple_companies):
+    source = ohlcv_df_multiple_companies.lazy().cache()
+    indicator_dfs = [
+        exponential_moving_average(source, identifier_column="ticker"),
+        moving_std(source, identifier_column="ticker"),
+        macd(source, identifier_column="ticker"),
+    ]
+    dfs = collect_indicators(indicator_dfs)
+    assert all(
+        df.frame_equal(lf.collect(), null_equal=True)
+        for df, lf in zip(dfs, indicator_dfs)
+    )
+    out = collect_indicators(indicator_dfs, how="horizontal")
+    assert out.columns == list(dict.fromkeys(c for df in dfs for c in df.columns))
+    expected = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [exponential_moving_average, moving_std, macd],
+        identifier_column="ticker",
+    ).collect()
+    assert out.select(expected.columns).frame_equal(expected, null_equal=True)
+
+
+def test_compute_indicators_output_modes(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.lit("meta").alias("exchange"))
+    indicators = [simple_moving_average, macd]
+    full = compute_indicators(df, indicators, identifier_column="ticker").collect()
+    indicator_columns = full.columns[2:]
+
+    lean = compute_indicators(
+        df, indicators, identifier_column="ticker", output="lean"
+    ).collect()
+    assert lean.columns == ["ticker", "row_nr", *indicator_columns]
+    assert lean["row_nr"].to_list() == list(range(df.height))
+    assert lean.drop("row_nr").frame_equal(full.drop("exchange"), null_equal=True)
+
+    append = macd(df, identifier_column="ticker", output="append").collect()
+    assert append.columns == [*df.columns, *[c for c in lean.columns if "_macd_" in c]]
+
+    with pytest.raises(ValueError):
+        simple_moving_average(df, output="wide")
+
+
+def test_time_window_indicators():
+    minutes = [0, 1, 2, 10, 11]
+    # Instruments are interleaved, with the rows of each sorted by time.
+    df = pl.DataFrame(
+        {
+            "time": [datetime(2023, 1, 1, 9, m) for m in minutes for _ in range(2)],
+            "ticker": ["AAPL", "MSFT"] * 5,
+            "close": [c for c in [1.0, 2.0, 6.0, 4.0, 8.0] for _ in range(2)],
+        }
+    )
+    kwargs = {
+        "period": "3m",
+        "identifier_column": "ticker",
+        "columns": ["close"],
+        "time_column": "time",
+    }
+    sma = simple_moving_average(df, **kwargs).collect()
+    assert sma["close_sma_3m"].to_list()[::2] == [1.0, 1.5, 3.0, 4.0, 6.0]
+    smm = simple_moving_median(df, **kwargs).collect()
+    assert smm.columns == ["time", "ticker", "close_smm_3m"]
+    assert smm["close_smm_3m"].to_list()[::2] == [1.0, 1.5, 2.0, 4.0, 6.0]
+    assert smm["close_smm_3m"].to_list()[1::2] == [1.0, 1.5, 2.0, 4.0, 6.0]
+    msd = moving_std(df, **kwargs).collect()
+    assert msd["close_msd_3m"][4] == pytest.approx(2.6457513)
+    assert msd["close_msd_3m"][8] == pytest.approx(2.8284271)
+
+
+def test_time_window_matches_rows_on_regular_bars(ohlcv_df_multiple_companies):
+    start = datetime(2023, 1, 1)
+    df = ohlcv_df_multiple_companies.with_columns(
+        pl.Series("time", [start + timedelta(minutes=i) for i in range(3000)] * 5)
+    )
+    # Time windows are partial over the first rows of an instrument, not null.
+    full_window = pl.Series([i >= 19 for i in range(3000)] * 5)
+    for func in [simple_moving_average, simple_moving_median, moving_std]:
+        rows = func(df, period=20, identifier_column="ticker").collect()
+        time = func(
+            df, period="20m", identifier_column="ticker", time_column="time"
+        ).collect()
+        time.columns = [c.replace("_20m", "_20") for c in time.columns]
+        assert_frame_equal(time.filter(full_window), rows.filter(full_window))
+
+
+def test_time_window_requires_time_column(ohlcv_df):
+    with pytest.raises(ValueError):
+        simple_moving_average(ohlcv_df, period="5m")
+    with pytest.raises(ValueError):
+        simple_moving_median(ohlcv_df, period="5m")
+    with pytest.raises(ValueError):
+        compute_indicators(
+            ohlcv_df, [(simple_moving_median, {"period": "5m", "time_column": "t"})]
+        )
+
+
+def test_vwap_multiple_companies(ohlcv_df_multiple_companies):
+    out = vwap(ohlcv_df_multiple_companies, identifier_column="ticker").collect()
+    assert out.columns == ["ticker", "vwap"]
+    tp = (pl.col("high") + pl.col("low") + pl.col("close")) / 3
+    expected = ohlcv_df_multiple_companies.select(
+        ((tp * pl.col("volume")).cumsum() / pl.col("volume").cumsum()).over("ticker")
+    )
+    assert_series_equal(out["vwap"], expected.to_series(), check_names=False)
+
+
+def test_vwap_session(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(
+        (pl.col("open") // 1000).alias("session")
+    )
+    out = vwap(df, identifier_column="ticker", session="session").collect()
+    tp = (pl.col("high") + pl.col("low") + pl.col("close")) / 3
+    expected = df.select(
+        ((tp * pl.col("volume")).cumsum() / pl.col("volume").cumsum()).over(
+            ["ticker", "session"]
+        )
+    )
+    assert_series_equal(out["vwap"], expected.to_series(), check_names=False)
+
+
+def test_vwap_rolling(ohlcv_df):
+    out = vwap(ohlcv_df, period=[5, 10]).collect()
+    assert out.columns == ["vwap_5", "vwap_10"]
+    tp = (pl.col("high") + pl.col("low") + pl.col("close")) / 3
+    expected = ohlcv_df.select(
+        (tp * pl.col("volume")).rolling_sum(5) / pl.col("volume").rolling_sum(5)
+    )
+    assert_series_equal(out["vwap_5"], expected.to_series(), check_names=False)
+    with pytest.raises(ValueError):
+        vwap(ohlcv_df, period=5, session="open")
+
+
+def test_compute_indicators_vwap(ohlcv_df):
+    out = compute_indicators(ohlcv_df, [vwap, simple_moving_average]).collect()
+    assert out.columns[0] == "vwap"
+    with pytest.raises(ValueError):
+        compute_indicators(ohlcv_df.drop("volume"), [vwap])
+
+
+def test_rsi_matches_finta(ohlcv_df):
+    df = ohlcv_df.with_columns(pl.col("close") % 7)
+    for adjust in [True, False]:
+        out = rsi(df, period=14, adjust=adjust).collect()
+        assert out.columns == [
+            "volume",
+            *[f"{c}_rsi_14" for c in ["open", "high", "low", "close"]],
+        ]
+        expected = TA.RSI(df.to_pandas(), 14, adjust=adjust)
+        assert out["close_rsi_14"].to_list()[1:] == pytest.approx(
+            expected.to_list()[1:]
+        )
+
+
+def test_rsi_multiple_companies(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.col("close") % 7)
+    out = rsi(df, identifier_column="ticker", columns=["close"]).collect()
+    single = rsi(df.filter(pl.col("ticker") == "AAPL"), columns=["close"]).collect()
+    per_ticker = out.partition_by("ticker", as_dict=True)
+    for ticker in ["AAPL", "FB"]:
+        assert_series_equal(per_ticker[ticker]["close_rsi_14"], single["close_rsi_14"])
+
+
+def test_bbands_matches_finta(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.col("close") % 7)
+    out = bbands(df, period=20, identifier_column="ticker").collect()
+    assert out.columns[:2] == ["volume", "ticker"]
+    assert out.columns[-3:] == [
+        "close_bbands_20_upper",
+        "close_bbands_20_middle",
+        "close_bbands_20_lower",
+    ]
+    expected = TA.BBANDS(df.filter(pl.col("ticker") == "FB").to_pandas(), 20)
+    fb = out.filter(pl.col("ticker") == "FB")
+    for band in ["upper", "middle", "lower"]:
+        assert fb[f"close_bbands_20_{band}"].to_list()[19:] == pytest.approx(
+            expected[f"BB_{band.upper()}"].to_list()[19:]
+        )
+
+
+def test_bbands_ma_func(ohlcv_df_multiple_companies):
+    out = bbands(
+        ohlcv_df_multiple_companies,
+        identifier_column="ticker",
+        ma_func=ema_expr,
+        columns=["close"],
+        sorted_by_identifier=True,
+        output="lean",
+    ).collect()
+    ema = exponential_moving_average(
+        ohlcv_df_multiple_companies, identifier_column="ticker", columns=["close"]
+    ).collect()
+    assert out.columns == [
+        "ticker",
+        "row_nr",
+        "close_bbands_20_upper",
+        "close_bbands_20_middle",
+        "close_bbands_20_lower",
+    ]
+    assert_series_equal(
+        out["close_bbands_20_middle"], ema["close_ema_20"], check_names=False
+    )
+
+
+def test_compute_indicators_bbands(ohlcv_df_multiple_companies):
+    out = compute_indicators(
+        ohlcv_df_multiple_companies,
+        [(bbands, {"period": [10, 20]}), rsi],
+        identifier_column="ticker",
+        sorted_by_identifier=True,
+        output="lean",
+    ).collect()
+    rsi_columns = [f"{c}_rsi_14" for c in ["open", "high", "low", "close"]]
+    assert out.columns[:6] == ["ticker", "row_nr", *rsi_columns]
+    for period in [10, 20]:
+        expected = bbands(
+            ohlcv_df_multiple_companies,
+            period=period,
+            identifier_column="ticker",
+            output="lean",
+        ).collect()
+        assert out.select(expected.columns).frame_equal(expected, null_equal=True)
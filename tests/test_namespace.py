@@ -0,0 +1,125 @@
+"""Tests for namespace.py."""
+from datetime import datetime, timedelta
+
+import polars as pl
+from polars.testing import assert_series_equal
+
+import finta_polars  # noqa: F401
+from finta_polars.indicators import (
+    bbands,
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    rsi,
+    simple_moving_average,
+    vwap,
+)
+
+
+def test_expr_namespace(ohlcv_df_multiple_companies):
+    out = ohlcv_df_multiple_companies.select(
+        pl.col("close").ta.ema(10, identifier_column="ticker"),
+        pl.col(["open", "close"]).ta.sma(5),
+        *pl.col("close").ta.macd(identifier_column="ticker"),
+    )
+    assert out.columns == [
+        "close_ema_10",
+        "open_sma_5",
+        "close_sma_5",
+        "close_macd_12_26",
+        "close_macd_12_26_signal",
+    ]
+    expected = exponential_moving_average(
+        ohlcv_df_multiple_companies, period=10, identifier_column="ticker"
+    ).collect()
+    assert out["close_ema_10"].series_equal(expected["close_ema_10"])
+
+
+def test_lazyframe_namespace_chains(ohlcv_df_multiple_companies):
+    out = (
+        ohlcv_df_multiple_companies.lazy()
+        .ta.ema(10, identifier_column="ticker")
+        .ta.macd(identifier_column="ticker")
+        .collect()
+    )
+    assert out.columns[:6] == ohlcv_df_multiple_companies.columns
+    assert "close_ema_10" in out.columns
+    expected = macd(ohlcv_df_multiple_companies, identifier_column="ticker").collect()
+    assert out["close_macd_12_26_signal"].series_equal(
+        expected["close_macd_12_26_signal"]
+    )
+
+
+def test_lazyframe_namespace_indicators(ohlcv_df_multiple_companies):
+    indicators = [exponential_moving_average, (macd, {"fast_period": 6})]
+    out = (
+        ohlcv_df_multiple_companies.lazy()
+        .ta.indicators(indicators, identifier_column="ticker")
+        .collect()
+    )
+    expected = compute_indicators(
+        ohlcv_df_multiple_companies, indicators, identifier_column="ticker"
+    ).collect()
+    assert out.select(expected.columns).frame_equal(expected)
+
+
+def test_lazyframe_namespace_duration_periods(ohlcv_df_multiple_companies):
+    start = datetime(2023, 1, 1)
+    df = ohlcv_df_multiple_companies.with_columns(
+        pl.Series("time", [start + timedelta(minutes=i) for i in range(3000)] * 5)
+    )
+    kwargs = {"identifier_column": "ticker", "time_column": "time"}
+    out = (
+        df.lazy()
+        .ta.sma("20m", columns=["close"], **kwargs)
+        .ta.msd("20m", columns=["close"], **kwargs)
+        .collect()
+    )
+    for func, name in [(simple_moving_average, "sma"), (moving_std, "msd")]:
+        expected = func(df, period="20m", columns=["close"], **kwargs).collect()
+        assert out[f"close_{name}_20m"].series_equal(
+            expected[f"close_{name}_20m"], null_equal=True
+        )
+
+
+def test_namespace_rsi(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.col("close") % 7)
+    out = df.lazy().ta.rsi(identifier_column="ticker", columns=["close"]).collect()
+    expected = rsi(df, identifier_column="ticker", columns=["close"]).collect()
+    assert out["close_rsi_14"].series_equal(expected["close_rsi_14"], null_equal=True)
+    expr_rsi = df.select(pl.col("close").ta.rsi(identifier_column="ticker"))
+    assert expr_rsi["close_rsi_14"].series_equal(
+        expected["close_rsi_14"], null_equal=True
+    )
+
+
+def test_namespace_vwap(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.col("close") % 7)
+    out = (
+        df.lazy()
+        .ta.vwap(identifier_column="ticker")
+        .with_columns(
+            pl.col("close").ta.vwap(identifier_column="ticker").alias("close_vwap")
+        )
+        .collect()
+    )
+    expected = vwap(df, identifier_column="ticker").collect()
+    assert_series_equal(out["vwap"], expected["vwap"])
+    close_vwap = df.select(
+        ((pl.col("close") * pl.col("volume")).cumsum() / pl.col("volume").cumsum())
+        .over("ticker")
+        .alias("close_vwap")
+    )
+    assert_series_equal(out["close_vwap"], close_vwap["close_vwap"])
+
+
+def test_namespaces_bbands(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(pl.col("close") % 7)
+    expected = bbands(df, identifier_column="ticker").collect()
+    out = df.lazy().ta.bbands(identifier_column="ticker").collect()
+    assert out.select(expected.columns).frame_equal(expected, null_equal=True)
+    names = [f"close_bbands_20_{band}" for band in ["upper", "middle", "lower"]]
+    expr_bands = df.select(pl.col("close").ta.bbands(identifier_column="ticker"))
+    for name in names:
+        assert_series_equal(expr_bands[name], expected[name])
@@ -0,0 +1,82 @@
+"""Tests for parallel.py."""
+import polars as pl
+
+from finta_polars.config import use_categorical_identifier, use_precision
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+from finta_polars.parallel import _balance_shards, compute_indicators_parallel
+
+INDICATORS = [
+    simple_moving_average,
+    moving_std,
+    simple_moving_median,
+    exponential_moving_average,
+    macd,
+]
+
+
+def test_balance_shards():
+    counts = pl.DataFrame(
+        {"ticker": ["A", "B", "C", "D", "E"], "count": [10, 50, 20, 20, 5]}
+    )
+    assert _balance_shards(counts, 2) == [["B", "E"], ["C", "D", "A"]]
+    assert _balance_shards(counts, 10) == [["B"], ["C"], ["D"], ["A"], ["E"]]
+
+
+def test_compute_indicators_parallel(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(
+        (pl.col("close") * pl.col("close").sin().abs()).alias("close")
+    ).filter((pl.col("ticker") == "AAPL") | (pl.col("open") % 7 < 3))
+    # Interleave the instruments, the output must keep the input row order.
+    df = df.sort("open")
+    out = compute_indicators_parallel(
+        df, INDICATORS, identifier_column="ticker", max_workers=2
+    )
+    expected = compute_indicators(df, INDICATORS, identifier_column="ticker").collect()
+    assert out.frame_equal(expected, null_equal=True)
+
+
+def test_compute_indicators_parallel_applies_config(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.filter(pl.col("open") % 7 < 3).sort("open")
+    with use_precision("float32"), use_categorical_identifier(True):
+        out = compute_indicators_parallel(
+            df, INDICATORS, identifier_column="ticker", max_workers=2
+        )
+        expected = compute_indicators(
+            df, INDICATORS, identifier_column="ticker"
+        ).collect()
+    assert out.schema == expected.schema
+    assert out["ticker"].dtype == pl.Categorical
+    assert out["close_sma_20"].dtype == pl.Float32
+    assert out.with_columns(pl.col("ticker").cast(pl.Utf8)).frame_equal(
+        expected.with_columns(pl.col("ticker").cast(pl.Utf8)), null_equal=True
+    )
+
+
+def test_compute_indicators_parallel_categorical_identifier(
+    ohlcv_df_multiple_companies,
+):
+    df = ohlcv_df_multiple_companies.filter(pl.col("open") % 7 < 3).sort("open")
+    df = df.with_columns(pl.col("ticker").cast(pl.Categorical))
+    out = compute_indicators_parallel(
+        df, INDICATORS, identifier_column="ticker", max_workers=2
+    )
+    expected = compute_indicators(df, INDICATORS, identifier_column="ticker").collect()
+    assert out["ticker"].dtype == pl.Categorical
+    assert out.with_columns(pl.col("ticker").cast(pl.Utf8)).frame_equal(
+        expected.with_columns(pl.col("ticker").cast(pl.Utf8)), null_equal=True
+    )
+
+
+def test_compute_indicators_parallel_empty(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.clear()
+    out = compute_indicators_parallel(df, INDICATORS, identifier_column="ticker")
+    expected = compute_indicators(df, INDICATORS, identifier_column="ticker").collect()
+    assert out.is_empty()
+    assert out.schema == expected.schema
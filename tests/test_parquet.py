@@ -0,0 +1,108 @@
+"""Tests for parquet.py."""
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+from finta_polars.parquet import compute_indicators_parquet
+
+INDICATORS = [
+    (simple_moving_average, {"period": 5}),
+    moving_std,
+    simple_moving_median,
+    exponential_moving_average,
+    macd,
+]
+
+
+@pytest.fixture
+def skewed_df(ohlcv_df_multiple_companies):
+    """Instruments of very different lengths, one longer than a chunk."""
+    return (
+        ohlcv_df_multiple_companies.with_columns(
+            (pl.col("close") * pl.col("close").sin().abs()).alias("close")
+        )
+        .filter(
+            (pl.col("ticker") == "AAPL")
+            | (pl.col("open") < 100)
+            | ((pl.col("ticker") == "MSFT") & (pl.col("open") < 800))
+        )
+        .sort(["ticker", "open"])
+    )
+
+
+def test_compute_indicators_parquet(skewed_df, tmp_path, assert_same_output):
+    skewed_df.write_parquet(tmp_path / "ohlcv.parquet", row_group_size=500)
+    paths = compute_indicators_parquet(
+        tmp_path / "ohlcv.parquet",
+        tmp_path / "out",
+        INDICATORS,
+        identifier_column="ticker",
+        chunk_rows=1000,
+    )
+    # AAPL is split into 3 slices, FB, GOOG and AMZN share a chunk.
+    assert len(paths) == 5
+    assert max(pl.read_parquet(p).height for p in paths) <= 1000
+    expected = compute_indicators(
+        skewed_df, INDICATORS, identifier_column="ticker"
+    ).collect()
+    assert_same_output(pl.read_parquet(tmp_path / "out" / "*.parquet"), expected)
+
+
+def test_compute_indicators_parquet_hive_partitioned(
+    skewed_df, tmp_path, assert_same_output
+):
+    for (ticker,), df in skewed_df.groupby(["ticker"], maintain_order=True):
+        (tmp_path / "ohlcv" / f"ticker={ticker}").mkdir(parents=True)
+        df.drop("ticker").write_parquet(
+            tmp_path / "ohlcv" / f"ticker={ticker}" / "0.parquet"
+        )
+    compute_indicators_parquet(
+        tmp_path / "ohlcv",
+        tmp_path / "out",
+        INDICATORS,
+        identifier_column="ticker",
+        chunk_rows=1000,
+    )
+    expected = compute_indicators(
+        skewed_df, INDICATORS, identifier_column="ticker"
+    ).collect()
+    assert_same_output(pl.read_parquet(tmp_path / "out" / "*.parquet"), expected)
+
+
+def test_compute_indicators_parquet_single_instrument(
+    ohlcv_df, tmp_path, assert_same_output
+):
+    ohlcv_df.write_parquet(tmp_path / "ohlcv.parquet")
+    paths = compute_indicators_parquet(
+        pl.scan_parquet(tmp_path / "ohlcv.parquet"),
+        tmp_path / "out",
+        INDICATORS,
+        chunk_rows=1000,
+    )
+    assert len(paths) == 3
+    expected = compute_indicators(ohlcv_df, INDICATORS).collect()
+    assert_same_output(pl.read_parquet(tmp_path / "out" / "*.parquet"), expected)
+
+
+def test_compute_indicators_parquet_single_instrument_glob(
+    ohlcv_df, tmp_path, assert_same_output
+):
+    (tmp_path / "ohlcv").mkdir()
+    ohlcv_df[:1500].write_parquet(tmp_path / "ohlcv" / "0.parquet")
+    ohlcv_df[1500:].write_parquet(tmp_path / "ohlcv" / "1.parquet")
+    paths = compute_indicators_parquet(
+        tmp_path / "ohlcv" / "*.parquet",
+        tmp_path / "out",
+        INDICATORS,
+        chunk_rows=1000,
+    )
+    assert [pl.read_parquet(p).height for p in paths[:-1]] == [1000] * (len(paths) - 1)
+    expected = compute_indicators(ohlcv_df, INDICATORS).collect()
+    assert_same_output(pl.read_parquet(tmp_path / "out" / "*.parquet"), expected)
@@ -0,0 +1,45 @@
+"""Tests for plan.py."""
+import polars as pl
+import pytest
+
+from finta_polars.config import use_schema_coercion
+from finta_polars.indicators import (
+    bbands,
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    simple_moving_average,
+)
+from finta_polars.plan import IndicatorPlan
+from finta_polars.schemas import PolarsSchemaError
+
+INDICATORS = [simple_moving_average, exponential_moving_average, macd, bbands]
+
+
+def test_indicator_plan(ohlcv_df_multiple_companies):
+    plan = IndicatorPlan(
+        INDICATORS, ohlcv_df_multiple_companies.schema, identifier_column="ticker"
+    )
+    for df in [
+        ohlcv_df_multiple_companies,
+        ohlcv_df_multiple_companies.with_columns(pl.col("close").sqrt()),
+    ]:
+        expected = compute_indicators(
+            df, INDICATORS, identifier_column="ticker"
+        ).collect()
+        assert plan(df).frame_equal(expected, null_equal=True)
+        assert plan.bind(df.lazy()).collect().frame_equal(expected, null_equal=True)
+
+
+def test_indicator_plan_schema_mismatch(ohlcv_df):
+    plan = IndicatorPlan(INDICATORS, ohlcv_df)
+    with pytest.raises(PolarsSchemaError):
+        plan(ohlcv_df.drop("volume"))
+    with pytest.raises(PolarsSchemaError):
+        IndicatorPlan(INDICATORS, ohlcv_df.with_columns(pl.col("close").cast(pl.Int64)))
+    with use_schema_coercion():
+        plan = IndicatorPlan(
+            INDICATORS, ohlcv_df.with_columns(pl.col("close").cast(pl.Int64))
+        )
+    out = plan(ohlcv_df.with_columns(pl.col("close").cast(pl.Int64)))
+    assert out["close_ema_20"].dtype == pl.Float64
@@ -0,0 +1,44 @@
+"""Tests for resampling ticks into bars."""
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from finta_polars.indicators import simple_moving_average
+from finta_polars.resample import resample_ticks
+from finta_polars.schemas import INDICATOR_VOLUME_SCHEMA
+
+
+def _ticks() -> pl.DataFrame:
+    start = datetime(2023, 1, 1, 9)
+    seconds = [0, 20, 40, 50, 70, 200, 210]
+    return pl.DataFrame(
+        {
+            "ticker": ["AAPL"] * 7 + ["MSFT"] * 7,
+            "time": [start + timedelta(seconds=s) for s in seconds] * 2,
+            "price": [10, 12, 9, 11, 13, 14, 12] * 2,
+            "size": [100, 200, 100, 300, 100, 100, 200] * 2,
+        }
+    )
+
+
+def test_resample_ticks():
+    bars = resample_ticks(_ticks(), "1m", identifier_column="ticker").collect()
+    assert bars.columns == ["ticker", "time", *INDICATOR_VOLUME_SCHEMA]
+    assert bars.select(list(INDICATOR_VOLUME_SCHEMA)).schema == INDICATOR_VOLUME_SCHEMA
+    aapl = bars.filter(pl.col("ticker") == "AAPL")
+    # No bar is created for the minute without trades.
+    assert aapl["time"].dt.minute().to_list() == [0, 1, 3]
+    assert aapl.select(INDICATOR_VOLUME_SCHEMA).rows() == [
+        (10.0, 12.0, 9.0, 11.0, 700.0),
+        (13.0, 13.0, 13.0, 13.0, 100.0),
+        (14.0, 14.0, 12.0, 12.0, 300.0),
+    ]
+
+
+def test_resample_ticks_fuses_with_indicators():
+    bars = resample_ticks(_ticks(), "1m", identifier_column="ticker")
+    fused = simple_moving_average(bars, period=2, identifier_column="ticker")
+    two_step = simple_moving_average(
+        bars.collect(), period=2, identifier_column="ticker"
+    )
+    assert fused.collect().frame_equal(two_step.collect(), null_equal=True)
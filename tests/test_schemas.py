@@ -2,7 +2,13 @@
 import polars as pl
 import pytest
 
-from finta_polars.schemas import validate_indicator_schema
+from finta_polars.schemas import (
+    _SCHEMA_CACHE,
+    PolarsSchemaError,
+    get_schema,
+    indicator_schema_casts,
+    validate_indicator_schema,
+)
 
 
 def test_validate_indicator_schema():
@@ -64,3 +70,43 @@ def test_validate_indicator_schema_missing_volume_raises_error():
     ).lazy()
     with pytest.raises(Exception):
         validate_indicator_schema(df, include_volume=True)
+
+
+def test_validate_indicator_schema_columns():
+    """Validate that only the requested columns are validated."""
+    df = pl.DataFrame({"close": [1.0, 2.0, 3.0], "volume": [100, 200, 300]}).lazy()
+    validate_indicator_schema(df, columns=["close", "volume"])
+    with pytest.raises(Exception):
+        validate_indicator_schema(df, columns=["open", "close"])
+
+
+def test_indicator_schema_casts():
+    """Validate that only the columns without an accepted dtype are cast."""
+    df = pl.DataFrame(
+        {
+            "open": [1, 2, 3],
+            "high": [2.0, 3.0, 4.0],
+            "low": pl.Series([0, 1, 2], dtype=pl.Int32),
+            "close": [1.0, 2.0, 3.0],
+            "volume": pl.Series([100, 200, 300], dtype=pl.UInt32),
+        }
+    ).lazy()
+    casts = indicator_schema_casts(df, include_volume=True)
+    assert [e.meta.output_name() for e in casts] == ["open", "low", "volume"]
+    assert set(df.with_columns(casts).schema.values()) == {pl.Float64}
+    assert indicator_schema_casts(df.with_columns(casts), include_volume=True) == []
+
+
+def test_indicator_schema_casts_non_numeric_raises_error():
+    """Validate that columns that cannot be cast to a float raise an error."""
+    df = pl.DataFrame({"close": ["1.0", "2.0"]}).lazy()
+    with pytest.raises(PolarsSchemaError):
+        indicator_schema_casts(df, columns=["close"])
+
+
+def test_get_schema_cached():
+    """Validate that the schema of a LazyFrame is only resolved once."""
+    df = pl.DataFrame({"close": [1.0, 2.0, 3.0]}).lazy()
+    assert df not in _SCHEMA_CACHE
+    assert get_schema(df) == {"close": pl.Float64}
+    assert _SCHEMA_CACHE[df] == {"close": pl.Float64}
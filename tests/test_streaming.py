@@ -0,0 +1,189 @@
+"""Tests for streaming.py."""
+import random
+
+import polars as pl
+import pytest
+
+from finta_polars.indicators import (
+    compute_indicators,
+    exponential_moving_average,
+    macd,
+    moving_std,
+    simple_moving_average,
+    simple_moving_median,
+)
+from finta_polars.streaming import (
+    EMAUpdater,
+    MACDUpdater,
+    MovingMedianUpdater,
+    MovingStdUpdater,
+    SMAUpdater,
+    StreamingEngine,
+    seed_ema_updaters,
+)
+
+
+@pytest.fixture
+def random_ohlc_df():
+    random.seed(0)
+    prices = [
+        None if random.random() < 0.02 else random.gauss(100, 5) for _ in range(500)
+    ]
+    return pl.DataFrame(
+        {
+            c: pl.Series(prices, dtype=pl.Float64)
+            for c in ["open", "high", "low", "close"]
+        }
+    )
+
+
+def _assert_matches(streamed, expected):
+    assert len(streamed) == len(expected)
+    for s, e in zip(streamed, expected):
+        if e is None:
+            assert s is None
+        else:
+            assert s == pytest.approx(e, rel=1e-9)
+
+
+@pytest.mark.parametrize(
+    "updater_cls, func, suffix",
+    [
+        (SMAUpdater, simple_moving_average, "sma"),
+        (MovingStdUpdater, moving_std, "msd"),
+        (MovingMedianUpdater, simple_moving_median, "smm"),
+    ],
+)
+@pytest.mark.parametrize("period", [4, 5])
+def test_rolling_updaters_match_batch(
+    random_ohlc_df, updater_cls, func, suffix, period
+):
+    expected = func(random_ohlc_df, period=period).collect()[f"close_{suffix}_{period}"]
+    updater = updater_cls(period)
+    streamed = [updater.update(x) for x in random_ohlc_df["close"]]
+    _assert_matches(streamed, expected.to_list())
+
+
+def test_moving_median_updater_with_ties():
+    random.seed(1)
+    df = pl.DataFrame(
+        {
+            "close": pl.Series(
+                [
+                    None if random.random() < 0.05 else float(random.randint(0, 5))
+                    for _ in range(500)
+                ],
+                dtype=pl.Float64,
+            )
+        }
+    )
+    for period in [1, 2, 7, 20]:
+        expected = simple_moving_median(df, period=period, columns=["close"]).collect()
+        updater = MovingMedianUpdater(period)
+        streamed = [updater.update(x) for x in df["close"]]
+        _assert_matches(streamed, expected[f"close_smm_{period}"].to_list())
+
+
+def test_ema_updater_matches_batch_exactly(random_ohlc_df):
+    expected = exponential_moving_average(random_ohlc_df, period=10).collect()
+    updater = EMAUpdater(10)
+    streamed = [updater.update(x) for x in random_ohlc_df["close"]]
+    assert streamed == expected["close_ema_10"].to_list()
+
+
+def test_ema_updater_seeded_from_batch_output(random_ohlc_df):
+    history, live = random_ohlc_df[:400], random_ohlc_df[400:]
+    updaters = seed_ema_updaters(
+        exponential_moving_average(history, period=10).collect(), history, period=10
+    )
+    streamed = [updaters["close"].update(x) for x in live["close"]]
+    expected = exponential_moving_average(random_ohlc_df, period=10).collect()
+    assert streamed == expected["close_ema_10"][400:].to_list()
+
+
+def test_rolling_updater_seeded_from_history(random_ohlc_df):
+    updater = SMAUpdater.from_history(random_ohlc_df["close"][390:400], period=5)
+    streamed = [updater.update(x) for x in random_ohlc_df["close"][400:]]
+    expected = simple_moving_average(random_ohlc_df, period=5).collect()
+    _assert_matches(streamed, expected["close_sma_5"][400:].to_list())
+
+
+def test_macd_updater_matches_batch_exactly(random_ohlc_df):
+    expected = macd(random_ohlc_df).collect()
+    updater = MACDUpdater.from_history(random_ohlc_df["close"][:300])
+    streamed = [updater.update(x) for x in random_ohlc_df["close"][300:]]
+    assert [m for m, _ in streamed] == expected["close_macd_12_26"][300:].to_list()
+    assert [s for _, s in streamed] == expected["close_macd_12_26_signal"][
+        300:
+    ].to_list()
+
+
+def test_streaming_engine_matches_batch(ohlcv_df_multiple_companies):
+    df = ohlcv_df_multiple_companies.with_columns(
+        pl.when(pl.col("close") % 97 == 0)
+        .then(None)
+        .otherwise(pl.col("close") * pl.col("close").sin().abs())
+        .alias("close"),
+        (pl.arange(0, pl.count()) % 3000).over("ticker").alias("row"),
+    ).drop("volume")
+    indicators = [
+        (simple_moving_average, {"period": 5}),
+        (moving_std, {"period": 10}),
+        (simple_moving_median, {"period": 4}),
+        exponential_moving_average,
+        macd,
+    ]
+    expected = (
+        compute_indicators(df.drop("row"), indicators, identifier_column="ticker")
+        .collect()
+        .filter(df["row"] >= 2990)
+    )
+    engine = StreamingEngine.from_history(
+        df.filter(pl.col("row") < 2990), indicators, identifier_column="ticker"
+    )
+    live = df.filter(pl.col("row") >= 2990).sort(["row", "ticker"])
+    out = engine.update(live.filter(pl.col("row") < 2995))
+    out = pl.concat([out, engine.update(live.filter(pl.col("row") >= 2995))])
+    expected = expected.with_columns(df.filter(pl.col("row") >= 2990)["row"]).sort(
+        ["row", "ticker"]
+    )
+    assert out.columns == expected.columns[:-1]
+    for c in out.columns[1:]:
+        assert out[c].null_count() == expected[c].null_count()
+        if "_ema_" in c or "_macd_" in c:
+            assert out[c].series_equal(expected[c], null_equal=True)
+        else:
+            assert (out[c] - expected[c]).abs().max() < 1e-9
+
+
+def test_streaming_engine_new_symbols_and_repeated_bars():
+    engine = StreamingEngine(
+        [(simple_moving_average, {"period": 2})],
+        identifier_column="ticker",
+        columns=["close"],
+        capacity=1,
+    )
+    out = engine.update(
+        pl.DataFrame({"ticker": ["A", "B", "A", "C"], "close": [1.0, 2.0, 3.0, 4.0]})
+    )
+    assert out.columns == ["ticker", "close_sma_2"]
+    assert out["close_sma_2"].to_list() == [None, None, 2.0, None]
+
+
+def test_streaming_engine_short_history_with_nulls():
+    df = pl.DataFrame(
+        {
+            "ticker": ["A"] * 8,
+            "close": [1.0, 2.0, 3.0, None, 5.0, 6.0, None, 8.0],
+        }
+    )
+    indicators = [(exponential_moving_average, {"period": 3}), macd]
+    expected = compute_indicators(
+        df, indicators, identifier_column="ticker", columns=["close"]
+    ).collect()[4:]
+    engine = StreamingEngine.from_history(
+        df[:4], indicators, identifier_column="ticker", columns=["close"]
+    )
+    out = engine.update(df[4:])
+    for c in out.columns[1:]:
+        _assert_matches(out[c].to_list(), expected[c].to_list())
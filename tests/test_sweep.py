@@ -0,0 +1,61 @@
+"""Tests for sweep.py."""
+import itertools
+
+import polars as pl
+
+from finta_polars.indicators import exponential_moving_average, macd
+from finta_polars.sweep import sweep_ema, sweep_macd
+
+
+def test_sweep_ema(ohlcv_df_multiple_companies):
+    out = sweep_ema(
+        ohlcv_df_multiple_companies, [5, 10], identifier_column="ticker"
+    ).collect()
+    assert out.shape == (30000, 4)
+    assert out.columns == ["ticker", "row", "period", "ema"]
+    assert out.dtypes[1:3] == [pl.UInt32, pl.UInt16]
+    expected = exponential_moving_average(
+        ohlcv_df_multiple_companies, period=10, identifier_column="ticker"
+    ).collect()["close_ema_10"]
+    assert out.filter(pl.col("period") == 10)["ema"].series_equal(expected.alias("ema"))
+
+
+def test_sweep_macd(ohlcv_df_multiple_companies):
+    grid = list(itertools.product([6, 12], [26], [5, 9]))
+    out = sweep_macd(
+        ohlcv_df_multiple_companies, grid, identifier_column="ticker"
+    ).collect()
+    assert out.shape == (60000, 7)
+    assert out.columns == [
+        "ticker",
+        "row",
+        "fast_period",
+        "slow_period",
+        "signal_period",
+        "macd",
+        "signal",
+    ]
+    for fast, slow, signal in grid:
+        expected = macd(
+            ohlcv_df_multiple_companies,
+            fast_period=fast,
+            slow_period=slow,
+            signal_period=signal,
+            identifier_column="ticker",
+        ).collect()
+        combination = out.filter(
+            (pl.col("fast_period") == fast) & (pl.col("signal_period") == signal)
+        )
+        suffix = f"_macd_{fast}_{slow}"
+        assert combination["macd"].series_equal(
+            expected["close" + suffix].alias("macd")
+        )
+        assert combination["signal"].series_equal(
+            expected["close" + suffix + "_signal"].alias("signal")
+        )
+
+
+def test_sweep_macd_single_instrument(ohlcv_df):
+    out = sweep_macd(ohlcv_df, [(12, 26, 9)]).collect()
+    assert out.columns[0] == "row"
+    assert out["row"].to_list() == list(range(3000))
@@ -0,0 +1,68 @@
+"""Tests for indicators of higher timeframes."""
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from finta_polars.config import use_categorical_identifier
+from finta_polars.indicators import exponential_moving_average, macd
+from finta_polars.resample import resample_bars
+from finta_polars.timeframes import compute_indicators_timeframes
+
+
+def _minute_bars(ohlcv_df_multiple_companies) -> pl.DataFrame:
+    start = datetime(2023, 1, 1)
+    return ohlcv_df_multiple_companies.with_columns(
+        pl.Series("time", [start + timedelta(minutes=i) for i in range(3000)] * 5)
+    )
+
+
+def test_resample_bars(ohlcv_df_multiple_companies):
+    bars = resample_bars(
+        _minute_bars(ohlcv_df_multiple_companies), "1h", identifier_column="ticker"
+    ).collect()
+    assert bars.shape == (5 * 50, 7)
+    assert bars.row(0) == ("AAPL", datetime(2023, 1, 1), 0.0, 60.0, -1.0, 59.0, 1770.0)
+
+
+def test_compute_indicators_timeframes(ohlcv_df_multiple_companies):
+    df = _minute_bars(ohlcv_df_multiple_companies)
+    indicators = [(exponential_moving_average, {"period": 3}), macd]
+    out = compute_indicators_timeframes(
+        df, ["1h", "1d"], indicators, identifier_column="ticker"
+    ).collect()
+    assert out.columns[: df.width] == df.columns
+    assert out.width == df.width + 2 * (5 + 4 * 2)
+    assert out["close_ema_3_1d"].null_count() == 5 * 24 * 60
+
+    hourly = exponential_moving_average(
+        resample_bars(df, "1h", identifier_column="ticker"),
+        period=3,
+        identifier_column="ticker",
+        columns=["close"],
+    ).collect()
+    # Each row sees the last hourly bar closed at or before its time.
+    row = out.filter(
+        (pl.col("ticker") == "MSFT") & (pl.col("time") == datetime(2023, 1, 1, 5, 59))
+    )
+    expected = hourly.filter(
+        (pl.col("ticker") == "MSFT") & (pl.col("time") == datetime(2023, 1, 1, 4))
+    )
+    assert row["close_ema_3_1h"].item() == expected["close_ema_3"].item()
+
+
+def test_compute_indicators_timeframes_categorical_identifier(
+    ohlcv_df_multiple_companies,
+):
+    df = _minute_bars(ohlcv_df_multiple_companies)
+    indicators = [(exponential_moving_average, {"period": 3})]
+    expected = compute_indicators_timeframes(
+        df, ["1h"], indicators, identifier_column="ticker"
+    ).collect()
+    with use_categorical_identifier(True):
+        out = compute_indicators_timeframes(
+            df, ["1h"], indicators, identifier_column="ticker"
+        ).collect()
+    assert out["ticker"].dtype == pl.Categorical
+    assert out.with_columns(pl.col("ticker").cast(pl.Utf8)).frame_equal(
+        expected, null_equal=True
+    )